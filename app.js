@@ -30,6 +30,7 @@ let stopwatchInterval = null;
 // Jake state
 let jakeState = 'chill';
 let jakeUpdateInterval = null;
+let jakeEvents = null;
 
 // Motivational quotes
 const motivationalQuotes = [
@@ -501,6 +502,28 @@ function stopJakeDrag() {
 }
 
 async function startJakeUpdates() {
+    if (jakeUpdateInterval || jakeEvents) return;
+    
+    // Prefer the API's event stream: updates arrive as soon as the tracker
+    // publishes them and nothing is read while Jake's state is unchanged
+    if (window.EventSource) {
+        jakeEvents = new EventSource('http://localhost:5000/api/events');
+        jakeEvents.addEventListener('state', (e) => {
+            updateJakeCharacter(JSON.parse(e.data).character_state);
+        });
+        jakeEvents.onerror = () => {
+            if (jakeEvents.readyState === EventSource.CLOSED) {
+                jakeEvents = null;
+                startJakePolling();
+            }
+        };
+        return;
+    }
+    
+    startJakePolling();
+}
+
+function startJakePolling() {
     if (jakeUpdateInterval) return;
     
     jakeUpdateInterval = setInterval(async () => {
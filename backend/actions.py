@@ -0,0 +1,196 @@
+"""
+Write actions for the Touchgrass API
+Each action checks its input against the current data, commits mutations
+to the store and returns (response body, HTTP status). The Flask routes and
+POST /api/batch share them.
+"""
+
+from datetime import datetime
+
+from data_store import set_op, add_op, update_op, remove_op
+from points_ledger import points_ops, title_id
+
+
+def set_mode(store, body, item_id=None):
+    """Set current mode (work/destress/selection)"""
+    mode = body.get('mode', 'selection')
+    store.commit([set_op('current_mode', mode)])
+    return {"success": True, "mode": mode}, 200
+
+
+def add_task(store, body, item_id=None):
+    """Add a new task"""
+    task_text = body.get('text', '')
+    if not task_text:
+        return {"error": "Task text required"}, 400
+
+    with store.view() as data:
+        task = {
+            'id': len(data['tasks']),
+            'text': task_text,
+            'completed': False,
+            'created_at': datetime.now().isoformat()
+        }
+        store.commit([add_op('tasks', task)])
+
+    print(f"✓ Added task: {task_text}")
+    return task, 200
+
+
+def toggle_task(store, body, item_id=None):
+    """Toggle task completion and award/deduct points"""
+    with store.view() as data:
+        task = next((t for t in data['tasks'] if t['id'] == item_id), None)
+        if task is None:
+            return {"error": "Task not found"}, 404
+
+        # Award/deduct points
+        completed = not task.get('completed', False)
+        change = 10 if completed else -10
+        store.commit([update_op('tasks', item_id, {'completed': completed})] + points_ops(change, 'task'))
+        points = data['focus_points']
+
+    if completed:
+        print(f"✓ Task completed! +10 points (now at {points})")
+    else:
+        print(f"⊘ Task unchecked. -10 points (now at {points})")
+    return {"success": True, "focus_points": points}, 200
+
+
+def delete_task(store, body, item_id=None):
+    """Delete a task"""
+    store.commit([remove_op('tasks', item_id)])
+    print(f"✓ Deleted task {item_id}")
+    return {"success": True}, 200
+
+
+def _add_entry(store, body, collection, points, source, date_field='date'):
+    entry = dict(body)
+    entry['id'] = str(datetime.now().timestamp())
+    entry[date_field] = datetime.now().isoformat()
+
+    with store.view() as data:
+        store.commit([add_op(collection, entry)] + points_ops(points, source))
+        return data['focus_points']
+
+
+def add_sentiment(store, body, item_id=None):
+    """Add sentiment entry and award points"""
+    points = _add_entry(store, body, 'sentiment_entries', 15, 'sentiment')
+    print(f"✓ Sentiment logged! +15 points (now at {points})")
+    return {"success": True, "points_earned": 15}, 200
+
+
+def add_food(store, body, item_id=None):
+    """Add food entry and award points"""
+    points = _add_entry(store, body, 'food_entries', 5, 'food')
+    print(f"✓ Meal logged! +5 points (now at {points})")
+    return {"success": True, "points_earned": 5}, 200
+
+
+def add_comfort(store, body, item_id=None):
+    """Add comfort vault item and award points"""
+    points = _add_entry(store, body, 'comfort_vault', 5, 'comfort', date_field='createdAt')
+    print(f"✓ Comfort item added! +5 points (now at {points})")
+    return {"success": True, "points_earned": 5}, 200
+
+
+def update_points(store, body, item_id=None):
+    """Update focus points (manually, or from the focus tracker with a source)"""
+    change = body.get('change', 0)
+    source = body.get('source', 'manual')
+    if not isinstance(change, int):
+        return {"error": "change must be an integer"}, 400
+    if not isinstance(source, str) or not source:
+        return {"error": "source must be a string"}, 400
+    with store.view() as data:
+        if change:
+            store.commit(points_ops(change, source[:32]))
+        points = data['focus_points']
+
+    print(f"Points updated: {change:+d} (now at {points})")
+    return {"focus_points": points}, 200
+
+
+def add_intervals(store, body, item_id=None):
+    """Record the focus tracker's activity intervals and the points earned in them"""
+    intervals = body.get('intervals')
+    if not isinstance(intervals, list):
+        return {"error": "intervals must be a list"}, 400
+    for interval in intervals:
+        try:
+            start = datetime.fromisoformat(interval['start'])
+            end = datetime.fromisoformat(interval['end'])
+        except (KeyError, TypeError, ValueError):
+            return {"error": "each interval needs ISO start and end times"}, 400
+        if end < start or not isinstance(interval.get('title'), str) or not isinstance(interval.get('points', 0), int):
+            return {"error": "each interval needs end >= start, a title and integer points"}, 400
+
+    with store.view() as data:
+        known = {t.get('id') for t in data['focus_titles']}
+        ops = []
+        for interval in intervals:
+            tid = title_id(interval['title'])
+            if tid not in known:
+                ops.append(add_op('focus_titles', {'id': tid, 'title': interval['title']}))
+                known.add(tid)
+            ops += points_ops(interval.get('points', 0), 'tracker', datetime.fromisoformat(interval['start']),
+                              end=datetime.fromisoformat(interval['end']).isoformat(timespec='seconds'), app=str(interval.get('app') or 'unknown')[:64],
+                              category=str(interval.get('category') or 'idle')[:32], title_id=tid)
+        if ops:
+            store.commit(ops)
+        points = data['focus_points']
+
+    return {"recorded": len(intervals), "focus_points": points}, 200
+
+
+def set_goal(store, body, item_id=None):
+    """Set daily goal"""
+    store.commit([
+        set_op('daily_goal', body.get('goal', '')),
+        set_op('daily_goal_completed', body.get('completed', False))
+    ])
+    return {"success": True}, 200
+
+
+ACTIONS = {
+    "set_mode": set_mode,
+    "add_task": add_task,
+    "toggle_task": toggle_task,
+    "delete_task": delete_task,
+    "add_sentiment": add_sentiment,
+    "add_food": add_food,
+    "add_comfort": add_comfort,
+    "update_points": update_points,
+    "add_intervals": add_intervals,
+    "set_goal": set_goal,
+}
+
+
+class BatchFailed(Exception):
+    """One operation of a batch failed; nothing in the batch was applied"""
+
+    def __init__(self, index, body, status):
+        super().__init__(body.get("error", "Operation failed"))
+        self.index = index
+        self.body = body
+        self.status = status
+
+
+def run_batch(store, operations):
+    """
+    Apply ``[{"op": name, "id": ..., "body": {...}}, ...]`` in order as one
+    store transaction: a single record and a single fsync, or nothing at all
+    if any operation fails. Returns the per-operation results.
+    """
+    results = []
+    with store.transaction():
+        for index, operation in enumerate(operations):
+            if not isinstance(operation, dict) or operation.get('op') not in ACTIONS:
+                raise BatchFailed(index, {"error": f"Unknown operation: {operation}"}, 400)
+            action = ACTIONS[operation['op']]
+            body, status = action(store, operation.get('body') or {}, operation.get('id'))
+            if status >= 400:
+                raise BatchFailed(index, body, status)
+            results.append({"op": operation['op'], "status": status, "body": body})
+    return results
@@ -1,8 +1,10 @@
 import tkinter as tk
 from tkinter import messagebox
-import os
 import winsound 
 import random
+import threading
+
+from state_channel import follow_state
 
 class TouchgrassAnimator:
     def __init__(self):
@@ -40,14 +42,20 @@ class TouchgrassAnimator:
         self.canvas.bind("<Double-Button-1>", self.open_comfort_vault)
         self.root.bind("<space>", lambda e: self.toggle_mode())
 
+        # Jake reacts to focus tracker state as soon as it changes
+        self.start_jake_updates()
+
         self.root.mainloop()
 
-    def update_jake_state(self):
-    state_file = "../character_state.txt"
-    if os.path.exists(state_file):
-        with open(state_file, "r") as f:
-            state = f.read().strip()
-            
+    def start_jake_updates(self):
+        """Follow character state changes from the tracker's local state slot"""
+        def on_state(state):
+            # Tk is not thread safe; hand the update to the main loop
+            self.root.after(0, self.update_jake_state, state)
+
+        threading.Thread(target=follow_state, args=(on_state,), daemon=True).start()
+
+    def update_jake_state(self, state):
         # Map backend states to your Jake sprites
         if state == "happy":
             self.canvas.itemconfig(self.sprite, image=self.sprites['happy'])
@@ -59,9 +67,6 @@ class TouchgrassAnimator:
             self.canvas.itemconfig(self.sprite, image=self.sprites['chill'])
             self.canvas.itemconfig(self.status_text, text="CHILLIN", fill="#3498db")
 
-    # Check again in 1 second
-    self.root.after(1000, self.update_jake_state)
-
     def load_and_scale_assets(self):
         """Loads PNGs and reduces size so the ENTIRE image fits"""
         asset_files = {
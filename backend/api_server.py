@@ -3,43 +3,146 @@ Flask API Server for Touchgrass App
 Connects React frontend with Python focus tracker
 """
 
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, jsonify, request, send_from_directory, stream_with_context
 from flask_cors import CORS
-import json
+from werkzeug.serving import BaseWSGIServer
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+import argparse
+import gzip
 import os
-from datetime import datetime
+import time
+import zlib
+
+import actions
+from archive import Archive
+from data_store import (DATA_FILE, DEFAULT_DATA, NEWEST_FIRST, open_store, export_document, validate_mutation,
+                        summarize_changes)
+from entry_index import EntryIndex
+from events import EventHub, format_sse
+from metrics import Metrics, instrument_app, instrument_store
+from points_ledger import PointsLedger, activity
+from state_channel import StateSlot
 
 app = Flask(__name__)
 CORS(app)  # Allow React app to connect from localhost:3000
 
+# Per-route latency/size histograms and storage timings (GET /api/metrics).
+# Registered first so it runs after the other response hooks and sees
+# the final (compressed) body.
+metrics = Metrics()
+instrument_app(app, metrics)
+
 # File paths
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-DATA_FILE = os.path.join(BASE_DIR,"..", "app_data.json")
 STATE_FILE = os.path.join(BASE_DIR,"..", "character_state.txt")
 ASSETS_DIR = os.path.join(BASE_DIR,"..", "assets")
 
-# Initialize data file if it doesn't exist
-def init_data():
-    if not os.path.exists(DATA_FILE):
-        default_data = {
-            "user": None,
-            "current_mode": "selection",
-            "tasks": [],
-            "notes": [],
-            "reminders": [],
-            "daily_goal": "",
-            "daily_goal_completed": False,
-            "sentiment_entries": [],
-            "food_entries": [],
-            "focus_points": 0,
-            "comfort_vault": [],
-            "focus_history": []
-        }
-        with open(DATA_FILE, 'w') as f:
-            json.dump(default_data, f, indent=2)
-        print(f"✓ Created {DATA_FILE}")
-
-init_data()
+# In-memory store: data is read once, changes go through the configured
+# storage engine (TOUCHGRASS_STORAGE=json|sqlite)
+with metrics.timer("store_operation_seconds", (("op", "load"),)):
+    store = open_store(DATA_FILE)
+instrument_store(store, metrics)
+
+# Date index behind the paginated list endpoints
+entry_index = EntryIndex(store, ["tasks", "sentiment_entries", "food_entries", "comfort_vault"])
+
+# Entries older than the hot window (TOUCHGRASS_HOT_DAYS) move to monthly
+# archive segments; the list endpoints page through both
+archive = Archive(store, entry_index)
+
+# Rollups of the focus points ledger (focus_history)
+ledger = PointsLedger(store)
+
+# Character state, points and mode changes pushed to /api/events
+hub = EventHub()
+
+# When the data / character state last changed (Last-Modified headers)
+last_modified = {"data": time.time(), "state": time.time()}
+
+def publish_store_status(seq=None, mutations=None):
+    """Store listener: forward points/mode changes to the event hub"""
+    last_modified["data"] = time.time()
+    hub.publish("points", {"focus_points": store.data.get("focus_points", 0), "points_today": ledger.today()})
+    hub.publish("mode", {"current_mode": store.data.get("current_mode", "selection")})
+
+def load_character_state():
+    """Seed the hub from the state slot (or file) once; the tracker then POSTs changes"""
+    slot = StateSlot()
+    version, state = slot.read()
+    slot.close()
+    if not version and os.path.exists(STATE_FILE):
+        with open(STATE_FILE, 'r') as f:
+            state = f.read().strip() or "idle"
+    hub.publish("state", {"character_state": state})
+
+load_character_state()
+publish_store_status()
+store.subscribe(publish_store_status)
+store.watch()  # writes from main_app.py show up without a request
+archive.start()
+
+# ============= HTTP CACHING =============
+
+# Changes whenever the server restarts, so a data file recreated from
+# scratch (version numbers starting over) can never match an old ETag
+ETAG_EPOCH = format(int(time.time()), 'x')
+
+# JSON bodies smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = 1024
+COMPRESSORS = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=6),
+    "deflate": lambda body: zlib.compress(body, 6),
+}
+
+# Assets requested with a version (?v=) never change under that URL
+ASSET_MAX_AGE = 24 * 3600
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+def conditional(version, modified, build):
+    """
+    Answer 304 if the client already has this version (If-None-Match, or
+    If-Modified-Since without one), otherwise call ``build()`` for the
+    response. Either way the validators are attached.
+    """
+    etag = f"{ETAG_EPOCH}-{version}"
+    tags = request.if_none_match
+    if tags:
+        fresh = any(tags.contains(tag) for tag in [etag] + [f"{etag}-{enc}" for enc in COMPRESSORS])
+    else:
+        since = request.if_modified_since
+        fresh = since is not None and int(modified) <= since.timestamp()
+    
+    response = Response(status=304) if fresh else build()
+    response.set_etag(etag)
+    # The header only has whole seconds, so it is only sent once the second
+    # of the last change is over: another change in that same second would
+    # otherwise carry the same Last-Modified and be answered with a 304
+    if int(time.time()) > int(modified):
+        response.last_modified = datetime.fromtimestamp(int(modified), timezone.utc)
+    # Cacheable, but always revalidated: polling clients get a cheap 304
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.after_request
+def compress(response):
+    """gzip/deflate large JSON responses for clients that accept it"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+    response.vary.add('Accept-Encoding')
+    body = response.get_data()
+    encoding = request.accept_encodings.best_match(list(COMPRESSORS))
+    if len(body) < COMPRESS_MIN_BYTES or not encoding:
+        return response
+    
+    response.set_data(COMPRESSORS[encoding](body))
+    response.headers['Content-Encoding'] = encoding
+    # A compressed body is a different representation, so it gets its own tag
+    etag, weak = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{encoding}", weak)
+    return response
 
 # ============= API ENDPOINTS =============
 
@@ -47,21 +150,18 @@ init_data()
 def get_status():
     """Get current character state and focus points"""
     try:
-        # Read character state
-        character_state = "idle"
-        if os.path.exists(STATE_FILE):
-            with open(STATE_FILE, 'r') as f:
-                character_state = f.read().strip()
-        
-        # Read app data
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-        
-        return jsonify({
-            "character_state": character_state,
-            "focus_points": data.get("focus_points", 0),
-            "current_mode": data.get("current_mode", "selection")
-        })
+        character_state = hub.get("state", {}).get("character_state", "idle")
+        
+        with store.view() as data:
+            return conditional(
+                f"s{store.seq}.{hub.seq}",
+                max(last_modified["data"], last_modified["state"]),
+                lambda: jsonify({
+                    "character_state": character_state,
+                    "focus_points": data.get("focus_points", 0),
+                    "current_mode": data.get("current_mode", "selection")
+                })
+            )
     except Exception as e:
         print(f"Error in get_status: {e}")
         return jsonify({"error": str(e)}), 500
@@ -70,78 +170,193 @@ def get_status():
 def get_data():
     """Get all app data"""
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-        return jsonify(data)
+        with store.view() as data:
+            response = conditional(f"d{store.seq}", last_modified["data"], lambda: jsonify(export_document(data)))
+            # Clients pass this to /api/changes?since= to sync incrementally
+            response.headers['X-Data-Version'] = str(store.seq)
+            return response
     except Exception as e:
         print(f"Error in get_data: {e}")
         return jsonify({"error": str(e)}), 500
 
+# Fields each screen needs for its first paint (GET /api/bootstrap).
+# character_state and points_today are derived, everything else is data.
+BOOTSTRAP_FIELDS = {
+    "work": ("character_state", "focus_points", "points_today", "current_mode", "daily_goal",
+             "daily_goal_completed", "tasks", "notes", "reminders"),
+    "chill": ("character_state", "focus_points", "points_today", "current_mode", "user",
+              "sentiment_entries", "food_entries", "comfort_vault"),
+    "selection": ("character_state", "focus_points", "points_today", "current_mode", "user"),
+}
+BOOTSTRAP_FIELDS["destress"] = BOOTSTRAP_FIELDS["chill"]
+DERIVED_FIELDS = {
+    "character_state": lambda data: hub.get("state", {}).get("character_state", "idle"),
+    "points_today": lambda data: ledger.today(),
+}
+
+def project(data, fields, limit):
+    """The requested fields; collections cut to their `limit` most recent entries"""
+    result, counts = {}, {}
+    for field in fields:
+        if field in DERIVED_FIELDS:
+            result[field] = DERIVED_FIELDS[field](data)
+            continue
+        value = data.get(field)
+        if isinstance(value, list):
+            counts[field] = len(value)
+            # In memory everything is append ordered; send document order
+            recent = value[-limit:]
+            value = recent[::-1] if field in NEWEST_FIRST else recent
+        result[field] = value
+    return result, counts
+
+@app.route('/api/bootstrap', methods=['GET'])
+def bootstrap():
+    """Everything one screen needs in one small response (?mode=work|chill&fields=a,b&limit=N)"""
+    try:
+        limit = max(1, min(request.args.get('limit', 20, type=int), 500))
+        fields = request.args.get('fields')
+        
+        with store.view() as data:
+            mode = request.args.get('mode', data.get('current_mode', 'selection'))
+            if fields:
+                fields = [field.strip() for field in fields.split(',') if field.strip()]
+                unknown = [f for f in fields if f not in DEFAULT_DATA and f not in DERIVED_FIELDS]
+                if unknown:
+                    return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+            elif mode in BOOTSTRAP_FIELDS:
+                fields = BOOTSTRAP_FIELDS[mode]
+            else:
+                return jsonify({"error": f"Unknown mode: {mode}"}), 400
+            
+            def build():
+                result, counts = project(data, fields, limit)
+                return jsonify({"version": store.seq, "mode": mode, "data": result, "counts": counts})
+            return conditional(f"b{store.seq}.{hub.seq}", max(last_modified.values()), build)
+    except Exception as e:
+        print(f"Error in bootstrap: {e}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/data', methods=['POST'])
 def save_data():
     """Save app data"""
     try:
-        data = request.json
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
+        store.replace(request.json)
         return jsonify({"success": True})
     except Exception as e:
         print(f"Error in save_data: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/data', methods=['PATCH'])
+def patch_data():
+    """Apply a list of mutations ({"ops": [...]}) and return the new version"""
+    try:
+        ops = json_body().get('ops', [])
+        for op in ops:
+            validate_mutation(op)
+            if op['op'] == 'replace':
+                raise ValueError("Use POST /api/data to replace the whole document")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        version = store.commit(ops)
+        return jsonify({"success": True, "version": version})
+    except Exception as e:
+        print(f"Error in patch_data: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/changes', methods=['GET'])
+def get_changes():
+    """Get what changed since a data version (full data if it is too old)"""
+    try:
+        since = request.args.get('since', type=int)
+        if since is None:
+            return jsonify({"error": "since is required"}), 400
+        
+        with store.view() as data:
+            records = store.records_since(since)
+            if records is None:
+                return jsonify({"version": store.seq, "reset": True, "data": export_document(data)})
+            delta = summarize_changes(records, data)
+            return jsonify({"version": store.seq, "reset": False, **delta})
+    except Exception as e:
+        print(f"Error in get_changes: {e}")
+        return jsonify({"error": str(e)}), 500
+
+def json_body():
+    """Request JSON, or {} for body-less requests (PATCH/DELETE on tasks)"""
+    return request.get_json(silent=True) or {}
+
+def respond(result):
+    """(body, status) from an action -> Flask response"""
+    body, status = result
+    return jsonify(body), status
+
 @app.route('/api/mode', methods=['POST'])
 def set_mode():
     """Set current mode (work/destress/selection)"""
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-        
-        mode = request.json.get('mode', 'selection')
-        data['current_mode'] = mode
-        
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        return jsonify({"success": True, "mode": mode})
+        return respond(actions.set_mode(store, json_body()))
     except Exception as e:
         print(f"Error in set_mode: {e}")
         return jsonify({"error": str(e)}), 500
 
+PAGE_PARAMS = ('limit', 'cursor', 'from', 'to', 'order')
+
+def list_entries(collection, default_order='desc'):
+    """One page of a collection: ?limit=&cursor=&from=&to=&order=asc|desc"""
+    try:
+        limit = max(1, min(request.args.get('limit', 20, type=int), 500))
+        order = request.args.get('order', default_order)
+        with store.view():
+            items, next_cursor = archive.query(
+                collection,
+                start=request.args.get('from'),
+                end=request.args.get('to'),
+                limit=limit,
+                cursor=request.args.get('cursor'),
+                descending=order != 'asc'
+            )
+            return jsonify({"items": items, "next_cursor": next_cursor})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error listing {collection}: {e}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/tasks', methods=['GET'])
 def get_tasks():
-    """Get all tasks"""
+    """Get all tasks (or one page of them when paging parameters are given)"""
+    if any(param in request.args for param in PAGE_PARAMS):
+        return list_entries('tasks', default_order='asc')
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-        return jsonify(data.get('tasks', []))
+        with store.view() as data:
+            return jsonify(data.get('tasks', []))
     except Exception as e:
         print(f"Error in get_tasks: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/sentiment', methods=['GET'])
+def get_sentiment():
+    """Page through sentiment entries, newest first"""
+    return list_entries('sentiment_entries')
+
+@app.route('/api/food', methods=['GET'])
+def get_food():
+    """Page through food entries, newest first"""
+    return list_entries('food_entries')
+
+@app.route('/api/comfort', methods=['GET'])
+def get_comfort():
+    """Page through comfort vault items, newest first"""
+    return list_entries('comfort_vault')
+
 @app.route('/api/tasks', methods=['POST'])
 def add_task():
     """Add a new task"""
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-        
-        task_text = request.json.get('text', '')
-        if not task_text:
-            return jsonify({"error": "Task text required"}), 400
-        
-        task = {
-            'id': len(data['tasks']),
-            'text': task_text,
-            'completed': False,
-            'created_at': datetime.now().isoformat()
-        }
-        data['tasks'].append(task)
-        
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        print(f"✓ Added task: {task_text}")
-        return jsonify(task)
+        return respond(actions.add_task(store, json_body()))
     except Exception as e:
         print(f"Error in add_task: {e}")
         return jsonify({"error": str(e)}), 500
@@ -150,31 +365,7 @@ def add_task():
 def toggle_task(task_id):
     """Toggle task completion and award/deduct points"""
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-        
-        task_found = False
-        for task in data['tasks']:
-            if task['id'] == task_id:
-                task['completed'] = not task.get('completed', False)
-                task_found = True
-                
-                # Award/deduct points
-                if task['completed']:
-                    data['focus_points'] = data.get('focus_points', 0) + 10
-                    print(f"✓ Task completed! +10 points (now at {data['focus_points']})")
-                else:
-                    data['focus_points'] = data.get('focus_points', 0) - 10
-                    print(f"⊘ Task unchecked. -10 points (now at {data['focus_points']})")
-                break
-        
-        if not task_found:
-            return jsonify({"error": "Task not found"}), 404
-        
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        return jsonify({"success": True, "focus_points": data['focus_points']})
+        return respond(actions.toggle_task(store, json_body(), task_id))
     except Exception as e:
         print(f"Error in toggle_task: {e}")
         return jsonify({"error": str(e)}), 500
@@ -183,16 +374,7 @@ def toggle_task(task_id):
 def delete_task(task_id):
     """Delete a task"""
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-        
-        data['tasks'] = [t for t in data['tasks'] if t['id'] != task_id]
-        
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        print(f"✓ Deleted task {task_id}")
-        return jsonify({"success": True})
+        return respond(actions.delete_task(store, json_body(), task_id))
     except Exception as e:
         print(f"Error in delete_task: {e}")
         return jsonify({"error": str(e)}), 500
@@ -201,21 +383,7 @@ def delete_task(task_id):
 def add_sentiment():
     """Add sentiment entry and award points"""
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-        
-        entry = request.json
-        entry['id'] = str(datetime.now().timestamp())
-        entry['date'] = datetime.now().isoformat()
-        
-        data['sentiment_entries'].insert(0, entry)  # Add to beginning
-        data['focus_points'] = data.get('focus_points', 0) + 15
-        
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        print(f"✓ Sentiment logged! +15 points (now at {data['focus_points']})")
-        return jsonify({"success": True, "points_earned": 15})
+        return respond(actions.add_sentiment(store, json_body()))
     except Exception as e:
         print(f"Error in add_sentiment: {e}")
         return jsonify({"error": str(e)}), 500
@@ -224,21 +392,7 @@ def add_sentiment():
 def add_food():
     """Add food entry and award points"""
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-        
-        entry = request.json
-        entry['id'] = str(datetime.now().timestamp())
-        entry['date'] = datetime.now().isoformat()
-        
-        data['food_entries'].insert(0, entry)
-        data['focus_points'] = data.get('focus_points', 0) + 5
-        
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        print(f"✓ Meal logged! +5 points (now at {data['focus_points']})")
-        return jsonify({"success": True, "points_earned": 5})
+        return respond(actions.add_food(store, json_body()))
     except Exception as e:
         print(f"Error in add_food: {e}")
         return jsonify({"error": str(e)}), 500
@@ -247,21 +401,7 @@ def add_food():
 def add_comfort():
     """Add comfort vault item and award points"""
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-        
-        entry = request.json
-        entry['id'] = str(datetime.now().timestamp())
-        entry['createdAt'] = datetime.now().isoformat()
-        
-        data['comfort_vault'].insert(0, entry)
-        data['focus_points'] = data.get('focus_points', 0) + 5
-        
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        print(f"✓ Comfort item added! +5 points (now at {data['focus_points']})")
-        return jsonify({"success": True, "points_earned": 5})
+        return respond(actions.add_comfort(store, json_body()))
     except Exception as e:
         print(f"Error in add_comfort: {e}")
         return jsonify({"error": str(e)}), 500
@@ -270,47 +410,137 @@ def add_comfort():
 def update_points():
     """Manually update focus points"""
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-        
-        change = request.json.get('change', 0)
-        data['focus_points'] = data.get('focus_points', 0) + change
-        
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        print(f"Points updated: {change:+d} (now at {data['focus_points']})")
-        return jsonify({"focus_points": data['focus_points']})
+        return respond(actions.update_points(store, json_body()))
     except Exception as e:
         print(f"Error in update_points: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/points', methods=['GET'])
+def get_points():
+    """Get the points balance, today's points and the split per source"""
+    try:
+        with store.view():
+            return jsonify(ledger.summary())
+    except Exception as e:
+        print(f"Error in get_points: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/points/history', methods=['GET'])
+def get_points_history():
+    """Points per hour or per day for the Focus Tracker chart (?bucket=hour|day&count=)"""
+    try:
+        bucket = request.args.get('bucket', 'hour')
+        count = request.args.get('count', 24 if bucket == 'hour' else 7, type=int)
+        count = max(1, min(count, 24 * 31 if bucket == 'hour' else 366))
+        with store.view():
+            return jsonify({"bucket": bucket, "series": ledger.series(bucket, count)})
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error in get_points_history: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/focus/intervals', methods=['POST'])
+def add_intervals():
+    """Record activity intervals from the focus tracker"""
+    try:
+        return respond(actions.add_intervals(store, json_body()))
+    except Exception as e:
+        print(f"Error in add_intervals: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/focus/activity', methods=['GET'])
+def get_activity():
+    """Time spent per app and per category on a day (?date=YYYY-MM-DD, default today)"""
+    try:
+        day = request.args.get('date') or datetime.now().strftime("%Y-%m-%d")
+        with store.view() as data:
+            return jsonify(activity(data['focus_history'], day))
+    except Exception as e:
+        print(f"Error in get_activity: {e}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/goal', methods=['POST'])
 def set_goal():
     """Set daily goal"""
     try:
-        with open(DATA_FILE, 'r') as f:
-            data = json.load(f)
-        
-        goal = request.json.get('goal', '')
-        completed = request.json.get('completed', False)
-        
-        data['daily_goal'] = goal
-        data['daily_goal_completed'] = completed
-        
-        with open(DATA_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        return jsonify({"success": True})
+        return respond(actions.set_goal(store, json_body()))
     except Exception as e:
         print(f"Error in set_goal: {e}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/batch', methods=['POST'])
+def batch():
+    """Apply a list of operations atomically with a single write"""
+    try:
+        operations = json_body().get('operations', [])
+        if not isinstance(operations, list):
+            return jsonify({"error": "operations must be a list"}), 400
+        results = actions.run_batch(store, operations)
+        return jsonify({"success": True, "version": store.seq, "results": results})
+    except actions.BatchFailed as e:
+        return jsonify({"error": str(e), "index": e.index, "result": e.body}), e.status
+    except Exception as e:
+        print(f"Error in batch: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/state', methods=['POST'])
+def set_character_state():
+    """Character state pushed by focus_tracker.py when it changes"""
+    try:
+        state = request.json.get('character_state', 'idle')
+        if hub.get("state") != {"character_state": state}:
+            last_modified["state"] = time.time()
+        hub.publish("state", {"character_state": state})
+        return jsonify({"success": True, "character_state": state})
+    except Exception as e:
+        print(f"Error in set_character_state: {e}")
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/api/events', methods=['GET'])
+def stream_events():
+    """Push state/points/mode changes (SSE, or ?mode=poll for long-polling)"""
+    # EventSource resends the last id it saw as a header when it reconnects
+    since = request.args.get('since', request.headers.get('Last-Event-ID'))
+    since = int(since) if since and since.lstrip('-').isdigit() else None
+    
+    if request.args.get('mode') == 'poll':
+        timeout = min(request.args.get('timeout', 25, type=float), 60)
+        events = hub.wait(since, timeout)
+        return jsonify({
+            "seq": events[-1][0] if events else since,
+            "events": [{"id": seq, "event": kind, "data": payload} for seq, kind, payload in events]
+        })
+    
+    def generate():
+        last = since
+        events = hub.events_since(last)
+        while True:
+            for seq, kind, payload in events:
+                last = seq
+                yield format_sse(seq, kind, payload)
+            events = hub.wait(last, timeout=15)
+            if not events:
+                yield ": keep-alive\n\n"
+    
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Request and storage metrics (Prometheus text, or JSON with ?format=json)"""
+    if request.args.get('format') == 'json':
+        return jsonify(metrics.json())
+    return Response(metrics.prometheus(), mimetype='text/plain; version=0.0.4')
+
 # Serve static assets (character images)
 @app.route('/assets/<path:filename>')
 def serve_asset(filename):
-    """Serve character images and other assets"""
-    return send_from_directory(ASSETS_DIR, filename)
+    """Serve character images and other assets (ETag/Last-Modified included)"""
+    response = send_from_directory(ASSETS_DIR, filename, max_age=ASSET_MAX_AGE)
+    if 'v' in request.args:
+        response.headers['Cache-Control'] = IMMUTABLE
+    return response
 
 @app.route('/')
 def index():
@@ -321,21 +551,89 @@ def index():
         "endpoints": [
             "GET /api/status - Get character state and points",
             "GET /api/data - Get all app data",
+            "GET /api/bootstrap - First-paint data for a screen (?mode=work|chill&fields=&limit=)",
             "POST /api/data - Save all app data",
+            "PATCH /api/data - Apply a list of mutations",
+            "GET /api/changes?since=<version> - Get changes since a data version",
             "POST /api/mode - Set current mode",
-            "GET /api/tasks - Get all tasks",
+            "GET /api/tasks - Get all tasks (?limit=&cursor=&from=&to= to page)",
             "POST /api/tasks - Add a task",
             "PATCH /api/tasks/<id> - Toggle task completion",
             "DELETE /api/tasks/<id> - Delete a task",
+            "GET /api/sentiment - Page sentiment entries (?limit=&cursor=&from=&to=)",
             "POST /api/sentiment - Add sentiment entry",
+            "GET /api/food - Page food entries (?limit=&cursor=&from=&to=)",
             "POST /api/food - Add food entry",
+            "GET /api/comfort - Page comfort items (?limit=&cursor=&from=&to=)",
             "POST /api/comfort - Add comfort item",
-            "POST /api/points - Update focus points",
-            "POST /api/goal - Set daily goal"
+            "GET /api/points - Get points balance, today's points and per-source totals",
+            "GET /api/points/history - Points per hour/day for charts (?bucket=hour|day&count=)",
+            "POST /api/points - Update focus points (optional source)",
+            "POST /api/focus/intervals - Record activity intervals (focus tracker)",
+            "GET /api/focus/activity - Time per app/category on a day (?date=)",
+            "POST /api/goal - Set daily goal",
+            "POST /api/batch - Apply several operations atomically",
+            "POST /api/state - Push character state (focus tracker)",
+            "GET /api/events - Stream state/points/mode changes (SSE, ?mode=poll)",
+            "GET /api/metrics - Request and storage metrics (Prometheus, ?format=json)"
         ]
     })
 
+# ============= SERVING =============
+
+# Worker threads for --serve. Every open /api/events stream holds one
+# thread, so leave room for the UI and Jake on top of normal requests.
+SERVE_THREADS = int(os.environ.get("TOUCHGRASS_THREADS", 16))
+
+class PooledWSGIServer(BaseWSGIServer):
+    """Werkzeug server that handles requests on a fixed pool of threads"""
+
+    def __init__(self, host, port, app, threads):
+        super().__init__(host, port, app)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="touchgrass")
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self.pool.shutdown(wait=False)
+
+def serve(host='0.0.0.0', port=5000, threads=SERVE_THREADS):
+    """
+    Production server: waitress when it is installed, otherwise werkzeug
+    on a thread pool. No debugger and no reloader, so there is one process
+    and one store. Writes are serialised by the store's writer lock (and the
+    data file lock, which also covers main_app.py).
+    """
+    try:
+        from waitress import serve as waitress_serve
+    except ImportError:
+        waitress_serve = None
+
+    if waitress_serve:
+        print(f"🍽️  Serving with waitress ({threads} threads)")
+        waitress_serve(app, host=host, port=port, threads=threads)
+    else:
+        print(f"🧵 Serving with werkzeug ({threads} threads; pip install waitress for a hardened server)")
+        PooledWSGIServer(host, port, app, threads).serve_forever()
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Touchgrass API server")
+    parser.add_argument('--serve', action='store_true', help="run the production server instead of the debug server")
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--threads', type=int, default=SERVE_THREADS, help="worker threads for --serve")
+    args = parser.parse_args()
+    
     print("=" * 50)
     print("🚀 Touchgrass API Server Starting...")
     print("=" * 50)
@@ -343,9 +641,12 @@ if __name__ == '__main__':
     print(f"📄 State file: {STATE_FILE}")
     print(f"🖼️  Assets dir: {ASSETS_DIR}")
     print("=" * 50)
-    print("🌐 Server running at: http://localhost:5000")
+    print(f"🌐 Server running at: http://localhost:{args.port}")
     print("🎨 React app should run at: http://localhost:3000")
     print("📊 Make sure focus_tracker.py is running!")
     print("=" * 50)
     
-    app.run(debug=True, port=5000, host='0.0.0.0')
+    if args.serve:
+        serve(args.host, args.port, args.threads)
+    else:
+        app.run(debug=True, port=args.port, host=args.host)
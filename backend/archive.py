@@ -0,0 +1,238 @@
+"""
+Cold storage for old Touchgrass entries
+Sentiment, food and comfort vault entries older than the hot window move
+out of the live data into one gzipped JSON segment per collection and
+month, listed in a small manifest. The list endpoints read segments back
+when a date range (or a page) reaches past the hot window.
+
+Archive once by hand with:
+    python archive.py [--days 90]
+"""
+
+import argparse
+import copy
+import gzip
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from data_store import DATA_FILE, FileLock, atomic_write, entry_date, file_identity, open_store, prune_op
+from entry_index import decode_cursor, encode_cursor
+
+ARCHIVE_DIR = os.environ.get("TOUCHGRASS_ARCHIVE_DIR", os.path.join(os.path.dirname(DATA_FILE), "archive"))
+
+# Entries older than this many days are archived (0 turns archiving off)
+HOT_DAYS = int(os.environ.get("TOUCHGRASS_HOT_DAYS", 90))
+
+ARCHIVED_COLLECTIONS = ("sentiment_entries", "food_entries", "comfort_vault")
+
+MANIFEST_FILE = "manifest.json"
+
+
+class Archive:
+    """
+    Monthly segments of archived entries for one data file.
+
+    ``archive_old_entries()`` writes the segments and the manifest before
+    pruning the entries from the store, all while holding the store's write
+    lock, so an entry is always in the live data, the archive, or (after a
+    crash in between) briefly both until the next run folds it in again.
+    Segments are sorted by date and keyed like the live index, so
+    ``query()`` can merge them into the same cursor pages. Decoded segments
+    are kept in a small LRU cache.
+
+    Call ``query()`` inside ``store.view()``; archiving takes the locks
+    it needs itself.
+    """
+
+    def __init__(self, store, index=None, root=ARCHIVE_DIR, hot_days=HOT_DAYS,
+                 collections=ARCHIVED_COLLECTIONS, cached_segments=12):
+        self.store = store
+        self.index = index
+        self.root = root
+        self.hot_days = hot_days
+        self.collections = collections
+        self.cached_segments = cached_segments
+        os.makedirs(root, exist_ok=True)
+        self.file_lock = FileLock(os.path.join(root, "archive.lock"))
+        self._manifest = {}
+        self._manifest_id = None
+        self._segments = OrderedDict()
+        self._thread = None
+
+    # ---------- segments ----------
+
+    def _manifest_path(self):
+        return os.path.join(self.root, MANIFEST_FILE)
+
+    def _segment_path(self, name, month):
+        return os.path.join(self.root, name, f"{month}.json.gz")
+
+    def manifest(self):
+        """{collection: {month: {"count", "first", "last"}}}, re-read when another process changed it"""
+        identity = file_identity(self._manifest_path())
+        if identity != self._manifest_id:
+            self._manifest = {}
+            if identity:
+                with open(self._manifest_path(), 'r') as f:
+                    self._manifest = json.load(f).get("collections", {})
+            self._manifest_id = identity
+        return self._manifest
+
+    def _save_manifest(self, manifest):
+        atomic_write(self._manifest_path(), json.dumps({"hot_days": self.hot_days, "collections": manifest}, indent=2))
+        self._manifest = manifest
+        self._manifest_id = file_identity(self._manifest_path())
+
+    def _read_segment(self, name, month):
+        """A month's entries, oldest first"""
+        path = self._segment_path(name, month)
+        identity = file_identity(path)
+        cached = self._segments.get((name, month))
+        if cached and cached[0] == identity:
+            self._segments.move_to_end((name, month))
+            return cached[1]
+        if identity is None:
+            return []
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            entries = json.load(f)
+        self._remember_segment(name, month, identity, entries)
+        return entries
+
+    def _remember_segment(self, name, month, identity, entries):
+        self._segments[(name, month)] = (identity, entries)
+        self._segments.move_to_end((name, month))
+        while len(self._segments) > self.cached_segments:
+            self._segments.popitem(last=False)
+
+    def _write_segment(self, name, month, items):
+        """Merge items into a month's segment (by id, so re-archiving is harmless)"""
+        merged = {item.get('id'): item for item in self._read_segment(name, month)}
+        merged.update((item['id'], item) for item in items)
+        entries = sorted(merged.values(), key=lambda item: (entry_date(item), str(item.get('id'))))
+
+        path = self._segment_path(name, month)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        atomic_write(path, gzip.compress(json.dumps(entries, separators=(',', ':')).encode('utf-8')))
+        self._remember_segment(name, month, file_identity(path), entries)
+        return {"count": len(entries), "first": entry_date(entries[0]), "last": entry_date(entries[-1])}
+
+    # ---------- archiving ----------
+
+    def archive_old_entries(self, now=None):
+        """Move entries older than the hot window into their monthly segments"""
+        if self.hot_days <= 0:
+            return 0
+        cutoff = ((now or datetime.now()) - timedelta(days=self.hot_days)).isoformat()
+
+        with self.file_lock, self.store.lock, self.store.engine.locked():
+            self.store.refresh()
+            manifest = copy.deepcopy(self.manifest())
+            ops = []
+            for name in self.collections:
+                # Entries need an id to be pruned and a date to be filed
+                old = [item for item in self.store.data.get(name, [])
+                       if isinstance(item, dict) and item.get('id') is not None
+                       and (entry_date(item) or cutoff) < cutoff]
+                if not old:
+                    continue
+                months = {}
+                for item in old:
+                    months.setdefault(entry_date(item)[:7], []).append(item)
+                for month, items in months.items():
+                    manifest.setdefault(name, {})[month] = self._write_segment(name, month, items)
+                ops.append(prune_op(name, [item['id'] for item in old]))
+
+            if not ops:
+                return 0
+            # Segments and manifest are on disk before the entries leave the live data
+            self._save_manifest(manifest)
+            self.store.commit(ops)
+
+        moved = sum(len(op['ids']) for op in ops)
+        print(f"✓ Archived {moved} entries older than {cutoff[:10]}")
+        return moved
+
+    def start(self, interval=3600):
+        """Archive now and then every ``interval`` seconds on a daemon thread"""
+        if self._thread:
+            return
+
+        def loop():
+            while True:
+                try:
+                    self.archive_old_entries()
+                except Exception as e:
+                    print(f"Error archiving entries: {e}")
+                time.sleep(interval)
+
+        self._thread = threading.Thread(target=loop, daemon=True)
+        self._thread.start()
+
+    # ---------- reads ----------
+
+    def query(self, name, start=None, end=None, limit=20, cursor=None, descending=True):
+        """
+        EntryIndex.query() over the live entries plus the archived ones.
+        Returns ``(items, next_cursor)``.
+        """
+        keys, items, more = self.index.page(name, start, end, limit, cursor, descending)
+        segments = self.manifest().get(name) if name in self.collections else None
+
+        # Newest first, a full page of live entries newer than anything
+        # archived is already the answer, so no segment is opened
+        if segments and not (descending and len(keys) == limit
+                             and keys[-1][0] > max(s["last"] for s in segments.values())):
+            after = decode_cursor(cursor) if cursor else None
+            archived = self._archived(name, segments, start, end, after, limit + 1, descending)
+            if archived:
+                merged = sorted(list(zip(keys, items)) + archived, key=lambda pair: pair[0], reverse=descending)
+                more = more or len(merged) > limit
+                keys = [key for key, _ in merged[:limit]]
+                items = [item for _, item in merged[:limit]]
+
+        next_cursor = encode_cursor(list(keys[-1])) if more and keys else None
+        return items, next_cursor
+
+    def _archived(self, name, segments, start, end, after, want, descending):
+        """Up to ``want`` archived (key, item) pairs in range and past the cursor, in page order"""
+        results = []
+        for month in sorted(segments, reverse=descending):
+            if (start and month < start[:7]) or (end and month > end[:7]):
+                continue
+            if after and (month > after[0][:7] if descending else month < after[0][:7]):
+                continue
+
+            entries = self._read_segment(name, month)
+            # Keys sort below live keys with the same date and follow segment order
+            pairs = []
+            for pos, item in enumerate(entries):
+                key = (entry_date(item) or "", pos - len(entries))
+                if start and key[0] < start:
+                    continue
+                if end and key[0] >= end + "\uffff":
+                    continue
+                if after and (key >= after if descending else key <= after):
+                    continue
+                pairs.append((key, item))
+            if descending:
+                pairs.reverse()
+
+            results.extend(pairs[:want - len(results)])
+            if len(results) >= want:
+                break
+        return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old entries into monthly archive segments")
+    parser.add_argument('--days', type=int, default=HOT_DAYS, help="size of the hot window in days")
+    args = parser.parse_args()
+
+    store = open_store(DATA_FILE)
+    moved = Archive(store, hot_days=args.days).archive_old_entries()
+    print(f"📦 {moved} entries archived to {ARCHIVE_DIR}")
+    store.close()
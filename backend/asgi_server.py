@@ -0,0 +1,377 @@
+"""
+Asyncio (ASGI) variant of the Touchgrass API server
+Same routes and JSON as api_server.py, but idle event streams and
+long-polls are coroutines instead of blocked threads, and /api/status is
+answered on the event loop. Every other route runs the Flask app on a
+thread pool, so disk writes and big JSON dumps never stall the loop.
+
+    python asgi_server.py [--port 5000] [--threads 16]
+    uvicorn asgi_server:app --port 5000
+
+Uses uvicorn when it is installed, otherwise a small built-in asyncio
+HTTP/1.1 server.
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote
+
+import api_server
+from api_server import COMPRESSORS, ETAG_EPOCH, SERVE_THREADS, hub, last_modified, metrics, store
+from events import format_sse
+
+# Runs the Flask app (and any store read that has to wait for the lock)
+executor = ThreadPoolExecutor(max_workers=SERVE_THREADS, thread_name_prefix="touchgrass-asgi")
+
+
+class HubWaiter:
+    """
+    Lets coroutines wait for EventHub events without a thread each.
+
+    The hub calls ``_on_publish`` from whichever thread published; it
+    hands the wake-up to the event loop, which sets the current Event and
+    starts a fresh one for the next round of waiters.
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self._changed = asyncio.Event()
+        hub.add_listener(self._on_publish)
+
+    def _on_publish(self, seq):
+        self.loop.call_soon_threadsafe(self._wake)
+
+    def _wake(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self, since, timeout, disconnected=None):
+        """Events newer than ``since``, waiting up to ``timeout`` seconds for one"""
+        if since is not None and hub.seq == since:
+            waits = [asyncio.ensure_future(self._changed.wait())]
+            if disconnected:
+                waits.append(disconnected)
+            await asyncio.wait(waits, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            waits[0].cancel()
+        return hub.events_since(since)
+
+
+_waiter = None
+
+def waiter():
+    global _waiter
+    if _waiter is None:
+        _waiter = HubWaiter(asyncio.get_running_loop())
+    return _waiter
+
+
+# ============= ASGI APP =============
+
+CORS_HEADERS = [(b"access-control-allow-origin", b"*")]
+
+def header(scope, name):
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+def query_params(scope):
+    return {key: values[-1] for key, values in parse_qs(scope["query_string"].decode("latin-1")).items()}
+
+async def send_json(send, status, payload, headers=()):
+    body = json.dumps(payload).encode()
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json")] + CORS_HEADERS + list(headers)})
+    await send({"type": "http.response.body", "body": body})
+
+async def app(scope, receive, send):
+    """The ASGI application"""
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    if scope["type"] != "http":
+        return
+
+    start = time.perf_counter()
+    route = scope["path"]
+    if scope["method"] == "GET" and route == "/api/events":
+        await stream_events(scope, receive, send)
+    elif scope["method"] == "GET" and route == "/api/status":
+        await get_status(scope, send)
+    else:
+        await run_wsgi(scope, receive, send)
+        return  # the Flask app records its own metrics
+    metrics.histogram("http_request_duration_seconds", (("route", route), ("method", "GET"))).observe(
+        time.perf_counter() - start)
+
+async def get_status(scope, send):
+    """GET /api/status on the loop; only waits on a thread if a write holds the store"""
+    def read():
+        return (hub.get("state", {}).get("character_state", "idle"), store.data.get("focus_points", 0),
+                store.data.get("current_mode", "selection"), store.seq, hub.seq)
+
+    if store.lock.acquire(blocking=False):
+        try:
+            state, points, mode, seq, hub_seq = read()
+        finally:
+            store.lock.release()
+    else:
+        def locked_read():
+            with store.lock:
+                return read()
+        state, points, mode, seq, hub_seq = await asyncio.get_running_loop().run_in_executor(executor, locked_read)
+
+    # Same validators as the Flask route, so clients can switch servers freely
+    etag = f'"{ETAG_EPOCH}-s{seq}.{hub_seq}"'
+    modified = int(max(last_modified["data"], last_modified["state"]))
+    headers = [(b"etag", etag.encode()), (b"last-modified", formatdate(modified, usegmt=True).encode()),
+               (b"cache-control", b"no-cache")]
+    tags = [tag.strip() for tag in (header(scope, b"if-none-match") or "").split(",")]
+    tags = [tag[2:] if tag.startswith("W/") else tag for tag in tags]
+    if etag in tags or any(f'"{etag[1:-1]}-{enc}"' in tags for enc in COMPRESSORS):
+        await send({"type": "http.response.start", "status": 304, "headers": CORS_HEADERS + headers})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    await send_json(send, 200, {"character_state": state, "focus_points": points, "current_mode": mode}, headers)
+
+async def stream_events(scope, receive, send):
+    """GET /api/events: SSE, or ?mode=poll for long-polling, each a coroutine"""
+    params = query_params(scope)
+    since = params.get("since", header(scope, b"last-event-id"))
+    since = int(since) if since and since.lstrip("-").isdigit() else None
+
+    async def until_disconnect():
+        while (await receive())["type"] != "http.disconnect":
+            pass
+    disconnected = asyncio.ensure_future(until_disconnect())
+
+    try:
+        if params.get("mode") == "poll":
+            timeout = min(float(params.get("timeout", 25)), 60)
+            events = await waiter().wait(since, timeout, disconnected)
+            await send_json(send, 200, {
+                "seq": events[-1][0] if events else since,
+                "events": [{"id": seq, "event": kind, "data": payload} for seq, kind, payload in events]
+            })
+            return
+
+        await send({"type": "http.response.start", "status": 200, "headers": [
+            (b"content-type", b"text/event-stream; charset=utf-8"), (b"cache-control", b"no-cache"),
+            (b"x-accel-buffering", b"no")] + CORS_HEADERS})
+        last = since
+        events = hub.events_since(last)
+        while not disconnected.done():
+            chunk = "".join(format_sse(seq, kind, payload) for seq, kind, payload in events)
+            if events:
+                last = events[-1][0]
+            await send({"type": "http.response.body", "body": (chunk or ": keep-alive\n\n").encode(),
+                        "more_body": True})
+            events = await waiter().wait(last, 15, disconnected)
+    finally:
+        disconnected.cancel()
+
+async def run_wsgi(scope, receive, send):
+    """Every other route: the Flask app itself, on the thread pool"""
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+
+    status, headers, payload = await asyncio.get_running_loop().run_in_executor(
+        executor, call_wsgi, wsgi_environ(scope, body))
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]})
+    await send({"type": "http.response.body", "body": payload})
+
+def wsgi_environ(scope, body):
+    server = scope.get("server") or ("localhost", 5000)
+    client = scope.get("client") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": "",
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "CONTENT_LENGTH": str(len(body)),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    for name, value in scope["headers"]:
+        key = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if key == "CONTENT_TYPE":
+            environ[key] = value
+        elif key != "CONTENT_LENGTH":
+            key = f"HTTP_{key}"
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+def call_wsgi(environ):
+    response = {}
+    def start_response(status, headers, exc_info=None):
+        response["status"] = int(status.split()[0])
+        response["headers"] = headers
+    result = api_server.app(environ, start_response)
+    try:
+        payload = b"".join(result)
+    finally:
+        if hasattr(result, "close"):
+            result.close()
+    return response["status"], response["headers"], payload
+
+
+# ============= BUILT-IN SERVER =============
+#
+# Just enough HTTP/1.1 to run the app without uvicorn: keep-alive,
+# Content-Length request bodies and chunked streaming responses.
+
+async def handle_connection(asgi_app, reader, writer):
+    peer = writer.get_extra_info("peername") or ("", 0)
+    sock = writer.get_extra_info("sockname") or ("", 0)
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                return
+            method, target, version = request_line.decode("latin-1").split()
+            headers = []
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b"\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                headers.append((name.strip().lower().encode("latin-1"), value.strip().encode("latin-1")))
+            fields = dict(headers)
+            length = int(fields.get(b"content-length", 0))
+            body = await reader.readexactly(length) if length else b""
+            connection = fields.get(b"connection", b"").lower()
+            keep_alive = connection == b"keep-alive" if version == "HTTP/1.0" else connection != b"close"
+
+            path, _, query = target.partition("?")
+            scope = {
+                "type": "http", "asgi": {"version": "3.0"}, "http_version": version[5:],
+                "method": method, "scheme": "http", "path": unquote(path), "raw_path": path.encode("latin-1"),
+                "query_string": query.encode("latin-1"), "root_path": "", "headers": headers,
+                "client": peer[:2], "server": sock[:2],
+            }
+            keep_alive = await respond(asgi_app, scope, body, writer, keep_alive, chunked=version != "HTTP/1.0")
+            if not keep_alive:
+                return
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+async def respond(asgi_app, scope, body, writer, keep_alive, chunked):
+    """Run one request through the app and write the response"""
+    disconnect = asyncio.Event()
+    sent_body = False
+    started = {}
+
+    async def receive():
+        nonlocal sent_body
+        if not sent_body:
+            sent_body = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnect.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            started.update(status=message["status"], headers=list(message.get("headers", [])))
+            return
+        data = message.get("body", b"")
+        more = message.get("more_body", False)
+        try:
+            if "streaming" not in started:
+                headers = started["headers"]
+                started["streaming"] = more
+                if more:
+                    headers.append((b"transfer-encoding", b"chunked") if chunked else (b"connection", b"close"))
+                elif not any(k == b"content-length" for k, _ in headers):
+                    headers.append((b"content-length", str(len(data)).encode()))
+                if not keep_alive:
+                    headers.append((b"connection", b"close"))
+                head = f"HTTP/1.1 {started['status']} {status_text(started['status'])}\r\n".encode()
+                head += b"".join(k + b": " + v + b"\r\n" for k, v in headers) + b"\r\n"
+                writer.write(head)
+            if started["streaming"] and chunked:
+                if data:
+                    writer.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                if not more:
+                    writer.write(b"0\r\n\r\n")
+            else:
+                writer.write(data)
+            await writer.drain()
+        except ConnectionError:
+            disconnect.set()
+            raise
+
+    try:
+        await asgi_app(scope, receive, send)
+    except ConnectionError:
+        return False
+    except Exception as e:
+        print(f"Error in {scope['method']} {scope['path']}: {e}")
+        if not started:
+            writer.write(b"HTTP/1.1 500 Internal Server Error\r\ncontent-length: 0\r\nconnection: close\r\n\r\n")
+        return False
+    finally:
+        disconnect.set()
+    return keep_alive and not (started.get("streaming") and not chunked)
+
+def status_text(status):
+    try:
+        return HTTPStatus(status).phrase
+    except ValueError:
+        return ""
+
+async def serve(asgi_app, host, port):
+    server = await asyncio.start_server(lambda r, w: handle_connection(asgi_app, r, w), host, port, limit=2 ** 20)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Touchgrass API server (asyncio)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=SERVE_THREADS, help="threads for the Flask routes")
+    args = parser.parse_args()
+    executor = ThreadPoolExecutor(max_workers=args.threads, thread_name_prefix="touchgrass-asgi")
+
+    try:
+        import uvicorn
+    except ImportError:
+        uvicorn = None
+
+    print(f"🚀 Touchgrass API (asyncio) at http://localhost:{args.port}, {args.threads} threads for Flask routes")
+    if uvicorn:
+        uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+    else:
+        try:
+            asyncio.run(serve(app, args.host, args.port))
+        except KeyboardInterrupt:
+            pass
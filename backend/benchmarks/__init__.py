@@ -0,0 +1,4 @@
+"""
+Benchmarks for the Touchgrass backend
+Run from the backend folder, e.g. ``python -m benchmarks.bench_store``
+"""
@@ -0,0 +1,149 @@
+"""
+Flask (--serve) vs asyncio server, side by side
+
+Both servers get the same worker threads and the same seeded data. Each
+scenario runs concurrent clients for a fixed time, mixing GET /api/status
+and POST /api/points, and counts requests that time out:
+  - quiet:      nothing else going on
+  - long-polls: IDLE clients parked on GET /api/events?mode=poll
+  - big reads:  a client pulling the whole GET /api/data in a loop
+
+    python -m benchmarks.bench_asgi
+    python -m benchmarks.bench_asgi --idle 200 --entries 30000 --seconds 10
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.bench_concurrency import percentile, request, start_server
+from benchmarks.datasets import write_dataset
+
+SERVERS = {
+    "flask": ("api_server.py", "--serve"),
+    "asyncio": ("asgi_server.py",),
+}
+
+
+def measure(url, clients, seconds, timeout):
+    """Latency of a status/points mix from `clients` threads for `seconds`"""
+    deadline = time.perf_counter() + seconds
+
+    def client(n):
+        timings, errors, i = [], 0, 0
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                if i % 4 == 0:
+                    request(f"{url}/api/points", {"change": 1}, timeout=timeout)
+                else:
+                    request(f"{url}/api/status", timeout=timeout)
+                timings.append((time.perf_counter() - start) * 1000)
+            except Exception:
+                errors += 1
+            i += 1
+        return timings, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(client, range(clients)))
+    elapsed = time.perf_counter() - start
+    timings = [t for result, _ in results for t in result]
+    throughput = round(len(timings) / elapsed, 1)
+    timings = timings or [float("nan")]
+    return {
+        "throughput_rps": throughput,
+        "p50_ms": round(percentile(timings, 50), 2),
+        "p95_ms": round(percentile(timings, 95), 2),
+        "p99_ms": round(percentile(timings, 99), 2),
+        "timeouts": sum(errors for _, errors in results),
+    }
+
+
+def background(target, count):
+    """Run `target(stop)` on `count` threads until the returned event is set"""
+    stop = threading.Event()
+    threads = [threading.Thread(target=target, args=(stop,), daemon=True) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return stop, threads
+
+
+def long_poller(url):
+    def poll(stop):
+        since = request(f"{url}/api/events?mode=poll&timeout=0")["seq"]
+        while not stop.is_set():
+            try:
+                since = request(f"{url}/api/events?mode=poll&timeout=10&since={since}")["seq"]
+            except Exception:
+                time.sleep(0.1)
+    return poll
+
+
+def big_reader(url):
+    def read(stop):
+        while not stop.is_set():
+            try:
+                with urllib.request.urlopen(f"{url}/api/data", timeout=60) as resp:
+                    resp.read()
+            except Exception:
+                time.sleep(0.1)
+    return read
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Flask vs asyncio API server")
+    parser.add_argument("--threads", type=int, default=16, help="worker threads for each server")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent measuring clients")
+    parser.add_argument("--seconds", type=float, default=5, help="how long each scenario runs")
+    parser.add_argument("--timeout", type=float, default=5, help="seconds before a request counts as timed out")
+    parser.add_argument("--idle", type=int, default=64, help="parked long-poll connections")
+    parser.add_argument("--entries", type=int, default=15000, help="entries in the seeded data")
+    parser.add_argument("--out", help="write the results as JSON here")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, command in SERVERS.items():
+            data_file = os.path.join(tmp, f"{name}.json")
+            write_dataset(data_file, args.entries)
+            proc, url = start_server(data_file, args.threads, command)
+            try:
+                results[name] = {"quiet": measure(url, args.clients, args.seconds, args.timeout)}
+
+                stop, threads = background(long_poller(url), args.idle)
+                time.sleep(1)  # let the polls park
+                results[name]["long-polls"] = measure(url, args.clients, args.seconds, args.timeout)
+                stop.set()
+                for thread in threads:
+                    thread.join()
+
+                stop, threads = background(big_reader(url), 1)
+                results[name]["big reads"] = measure(url, args.clients, args.seconds, args.timeout)
+                stop.set()
+                for thread in threads:
+                    thread.join()
+            finally:
+                proc.terminate()
+                proc.wait()
+
+    print(f"{args.clients} clients for {args.seconds}s per scenario, {args.threads} server threads, "
+          f"{args.idle} parked long-polls, {args.entries} entries")
+    print(f"{'scenario':<12} {'server':<8} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'timeouts':>9}")
+    for scenario in ("quiet", "long-polls", "big reads"):
+        for name in SERVERS:
+            r = results[name][scenario]
+            print(f"{scenario:<12} {name:<8} {r['throughput_rps']:>8} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9} {r['timeouts']:>9}")
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Window titles classified per second as the rule list grows
+
+Compares the tracker's old check (``any(app in title for app in ...)`` over
+each list in turn) with the compiled RuleSet from classifier.py. The
+compiled numbers should stay roughly flat from a dozen rules to thousands.
+
+The cached column replays a day of 5 second ticks (a few dozen titles,
+some far more common than others) through Classifier's LRU and reports
+its hit rate.
+
+    python -m benchmarks.bench_classifier
+    python -m benchmarks.bench_classifier --titles 20000
+"""
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+
+from classifier import DEFAULT_RULES, Classifier, RuleSet
+
+RULE_COUNTS = [12, 100, 1000, 5000]
+
+DAY_TICKS = 24 * 60 * 60 // 5
+
+TITLES = [
+    "youtube - google chrome", "main.py - visual studio code", "inbox (3) - outlook",
+    "reddit: the front page of the internet", "untitled - notepad", "spotify premium",
+    "quarterly report.docx - word", "netflix", "slack | general", "terminal", "idle",
+    "how to center a div - stack overflow - mozilla firefox",
+]
+
+
+def make_rules(count, rng):
+    """DEFAULT_RULES padded with random words up to `count` rules, split between the two categories"""
+    rules = {"categories": [dict(c, substrings=list(c["substrings"])) for c in DEFAULT_RULES["categories"]]}
+    for i in range(count - sum(len(c["substrings"]) for c in rules["categories"])):
+        word = ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 12)))
+        rules["categories"][i % 2]["substrings"].append(word)
+    return rules
+
+
+def day_trace(rng, distinct=40):
+    """A day of titles: TITLES plus numbered tabs, picked with a long-tailed skew"""
+    titles = TITLES + [f"{rng.choice(TITLES)} ({i})" for i in range(distinct - len(TITLES))]
+    weights = [1 / (rank + 1) for rank in range(len(titles))]
+    return rng.choices(titles, weights, k=DAY_TICKS)
+
+
+def naive_classifier(rules):
+    lists = [(c["name"], c["weight"], c["substrings"]) for c in rules["categories"]]
+
+    def classify(title):
+        for name, weight, apps in lists:
+            if any(app in title for app in apps):
+                return name, weight
+        return "idle", 0
+    return classify
+
+
+def titles_per_second(classify, titles):
+    start = time.perf_counter()
+    for title in titles:
+        classify(title)
+    return len(titles) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Window title classification throughput")
+    parser.add_argument("--titles", type=int, default=5000, help="titles classified per measurement")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    titles = [rng.choice(TITLES) for _ in range(args.titles)]
+    trace = day_trace(rng)
+
+    print(f"{'rules':>6} {'naive titles/s':>15} {'compiled titles/s':>18} {'cached titles/s':>16} "
+          f"{'hit rate':>9} {'compile ms':>11}")
+    for count in RULE_COUNTS:
+        rules = make_rules(count, rng)
+        naive = naive_classifier(rules)
+
+        start = time.perf_counter()
+        compiled = RuleSet(rules)
+        compile_ms = (time.perf_counter() - start) * 1000
+
+        # Both must agree before their speed means anything
+        assert all(naive(t) == compiled.classify(t) for t in TITLES)
+
+        # A Classifier with no rules file, given the generated rules
+        cached = Classifier(path=os.path.join(tempfile.gettempdir(), "no-such-rules.json"), check_interval=3600)
+        cached.rules = compiled
+        cached_rate = titles_per_second(cached.classify, trace)
+
+        print(f"{count:>6} {titles_per_second(naive, titles):>15,.0f} "
+              f"{titles_per_second(compiled.classify, titles):>18,.0f} {cached_rate:>16,.0f} "
+              f"{cached.stats()['hit_rate']:>9.2%} {compile_ms:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Lost-update check for the production server under parallel load
+
+Starts ``api_server.py --serve`` (one or more processes sharing one data
+file), fires POST /api/points {"change": 1} from many client threads at
+once and then checks that focus_points and the points ledger account for
+every single request. Exits non-zero if any increment was lost.
+
+    python -m benchmarks.bench_concurrency
+    python -m benchmarks.bench_concurrency --servers 2 --clients 32 --requests 100
+    TOUCHGRASS_STORAGE=sqlite python -m benchmarks.bench_concurrency
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(url, body=None, timeout=30):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return json.loads(resp.read())
+
+
+def start_server(data_file, threads, command=("api_server.py", "--serve")):
+    port = free_port()
+    # No background archiving: measure the whole dataset, not a store being pruned mid-run
+    env = dict(os.environ, TOUCHGRASS_DATA_FILE=data_file, TOUCHGRASS_HOT_DAYS="0")
+    proc = subprocess.Popen(
+        [sys.executable, *command, "--host", "127.0.0.1", "--port", str(port), "--threads", str(threads)],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            request(f"{url}/api/status")
+            return proc, url
+        except Exception:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--servers", type=int, default=1, help="server processes sharing the data file")
+    parser.add_argument("--threads", type=int, default=16, help="worker threads per server")
+    parser.add_argument("--clients", type=int, default=16, help="concurrent client threads")
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_file = os.path.join(tmp, "app_data.json")
+        servers = [start_server(data_file, args.threads) for _ in range(args.servers)]
+        urls = [url for _, url in servers]
+
+        def client(n):
+            url = urls[n % len(urls)]
+            timings = []
+            for _ in range(args.requests):
+                start = time.perf_counter()
+                request(f"{url}/api/points", {"change": 1, "source": "bench"})
+                timings.append((time.perf_counter() - start) * 1000)
+            return timings
+
+        try:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.clients) as pool:
+                timings = [t for result in pool.map(client, range(args.clients)) for t in result]
+            elapsed = time.perf_counter() - start
+
+            expected = args.clients * args.requests
+            totals = [request(f"{url}/api/points") for url in urls]
+        finally:
+            for proc, _ in servers:
+                proc.terminate()
+                proc.wait()
+
+    print(f"{expected} increments from {args.clients} clients against {args.servers} server(s), "
+          f"{args.threads} threads each")
+    print(f"throughput {expected / elapsed:.0f} req/s, "
+          f"p50 {percentile(timings, 50):.2f} ms, p95 {percentile(timings, 95):.2f} ms, "
+          f"p99 {percentile(timings, 99):.2f} ms")
+
+    lost = False
+    for url, summary in zip(urls, totals):
+        ledger = summary["by_source"].get("bench", 0)
+        ok = summary["focus_points"] == expected and ledger == expected
+        lost = lost or not ok
+        print(f"{'✓' if ok else '✗'} {url}: focus_points={summary['focus_points']} ledger={ledger} "
+              f"(expected {expected})")
+    sys.exit(1 if lost else 0)
+
+
+if __name__ == "__main__":
+    main()
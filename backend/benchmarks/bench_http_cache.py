@@ -0,0 +1,97 @@
+"""
+Bytes and latency a polling client saves with ETags and compression
+
+Simulates a client polling GET /api/data and GET /api/status while the
+data changes every CHANGE_EVERY polls. Compares plain polling with gzip,
+conditional requests (If-None-Match or If-Modified-Since -> 304) and
+gzip with ETags together. A 304 right after a change is counted as stale.
+
+    python -m benchmarks.bench_http_cache
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_store import BACKEND_DIR, seed_file
+
+ENTRIES = 5000
+POLLS = 200
+CHANGE_EVERY = 10
+
+MODES = {
+    "plain": (False, None),
+    "gzip": (True, None),
+    "etag": (False, "etag"),
+    "modified": (False, "modified"),
+    "etag+gzip": (True, "etag"),
+}
+
+
+def poll(client, path, compressed, conditional):
+    """POLLS requests like a polling client would send them; (bytes, avg ms, stale 304s)"""
+    etag = modified = None
+    total_bytes = stale = 0
+    start = time.perf_counter()
+    for i in range(POLLS):
+        if i % CHANGE_EVERY == 0:
+            client.post('/api/points', json={'change': 1})
+        headers = {}
+        if compressed:
+            headers['Accept-Encoding'] = 'gzip'
+        if conditional == "etag" and etag:
+            headers['If-None-Match'] = etag
+        if conditional == "modified" and modified:
+            headers['If-Modified-Since'] = modified
+        response = client.get(path, headers=headers)
+        etag = response.headers.get('ETag', etag)
+        modified = response.headers.get('Last-Modified', modified)
+        total_bytes += len(response.get_data())
+        stale += i % CHANGE_EVERY == 0 and response.status_code == 304
+    return total_bytes, (time.perf_counter() - start) / POLLS * 1000, stale
+
+
+def run_in_process():
+    """Runs in a child whose TOUCHGRASS_DATA_FILE points at the seeded data"""
+    import api_server
+
+    client = api_server.app.test_client()
+    print(f"{POLLS} polls, data changing every {CHANGE_EVERY}, {ENTRIES} entries per collection")
+    print(f"{'endpoint':<12} {'mode':<10} {'body KB':>10} {'saved':>7} {'ms/poll':>8} {'stale':>6}")
+    for route in ('/api/data', '/api/status'):
+        baseline = None
+        for mode, (compressed, conditional) in MODES.items():
+            # Routes print a line per mutation; keep the table readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                total_bytes, ms, stale = poll(client, route, compressed, conditional)
+            baseline = baseline or total_bytes
+            saved = 100 * (1 - total_bytes / baseline)
+            print(f"{route:<12} {mode:<10} {total_bytes / 1024:>10.1f} {saved:>6.1f}% {ms:>8.3f} {stale:>6}")
+
+    api_server.store.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes and latency saved by ETags and compression")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    if parser.parse_args().child:
+        run_in_process()
+        return
+
+    # The server (store, index, archive, ledger) is only ever opened on the
+    # seeded copy, in a process of its own, never on the real app_data.json
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "app_data.json")
+        seed_file(path, ENTRIES)
+        env = dict(os.environ, TOUCHGRASS_DATA_FILE=path)
+        subprocess.run([sys.executable, "-m", "benchmarks.bench_http_cache", "--child"],
+                       cwd=BACKEND_DIR, env=env, check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""
+Per-request latency of the API as app_data.json grows
+
+Compares the old read-modify-write pattern (json.load + json.dump of the
+whole file on every request) with the in-memory DataStore used by
+api_server.py. The store numbers should stay flat as history grows.
+
+    python -m benchmarks.bench_store
+    TOUCHGRASS_STORAGE=sqlite python -m benchmarks.bench_store
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from data_store import DEFAULT_DATA
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SIZES = [100, 1000, 10000, 50000]
+REQUESTS = 200
+
+
+def seed_file(path, entries):
+    """Write an app_data.json with `entries` sentiment and food entries"""
+    data = json.loads(json.dumps(DEFAULT_DATA))
+    now = datetime.now().isoformat()
+    for i in range(entries):
+        data['sentiment_entries'].append({'id': str(i), 'date': now, 'mood': 'happy', 'color': '#ffaa00', 'answers': ['ok']})
+        data['food_entries'].append({'id': str(i), 'date': now, 'time': '12:00', 'meal': 'lunch', 'ate': True})
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def legacy_request(path):
+    """The pre-store request pattern: parse everything, change one field, rewrite everything"""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    data['focus_points'] = data.get('focus_points', 0) + 1
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+
+def time_per_call(fn, n=REQUESTS):
+    start = time.perf_counter()
+    for _ in range(n):
+        fn()
+    return (time.perf_counter() - start) / n * 1000
+
+
+def run_in_process():
+    """Runs in a child whose TOUCHGRASS_DATA_FILE points at the seeded data"""
+    # Routes print a line per mutation; keep the table readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        import api_server
+        client = api_server.app.test_client()
+        post_ms = time_per_call(lambda: client.post('/api/points', json={'change': 1}))
+        status_ms = time_per_call(lambda: client.get('/api/status'))
+        api_server.store.close()
+    print(json.dumps({"post_ms": post_ms, "status_ms": status_ms}))
+
+
+def store_request_ms(path):
+    """(POST, GET) ms per request for an api_server on ``path``, in a fresh process"""
+    env = dict(os.environ, TOUCHGRASS_DATA_FILE=path)
+    out = subprocess.run([sys.executable, "-m", "benchmarks.bench_store", "--child"],
+                         cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True).stdout
+    result = json.loads(out.strip().splitlines()[-1])
+    return result["post_ms"], result["status_ms"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request latency as app_data.json grows")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    if parser.parse_args().child:
+        run_in_process()
+        return
+
+    print(f"{'entries':>8} {'legacy ms':>10} {'POST /api/points ms':>20} {'GET /api/status ms':>19}")
+    for size in SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "app_data.json")
+            seed_file(path, size)
+            legacy_ms = time_per_call(lambda: legacy_request(path), n=max(5, REQUESTS // (size // 1000 + 1)))
+            post_ms, status_ms = store_request_ms(path)
+
+        print(f"{size:>8} {legacy_ms:>10.3f} {post_ms:>20.3f} {status_ms:>19.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+A simulated week through the whole focus tracker pipeline
+
+Replays a window trace (a synthetic week by default) on a SimulatedClock
+through track_focus(): classification, scoring, notes, state publishing
+and interval reports to a real ``api_server.py --serve`` on a temp data
+file. No window system, audio or waiting needed, so it runs headless.
+
+Reports window events per second of wall time and how many times faster
+than real time the week went. It then checks the server against the
+tracker: the points balance must match, and the recorded intervals must
+cover the whole trace.
+
+    python -m benchmarks.bench_tracker
+    python -m benchmarks.bench_tracker --days 28 --seed 3
+    python -m benchmarks.bench_tracker --trace my_day.jsonl
+    python -m benchmarks.bench_tracker --heartbeat 5   # same points, more wake-ups
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import focus_tracker
+import utils
+from benchmarks.bench_concurrency import request, start_server
+from clock import SimulatedClock
+from window_trace import ReplayWindowSource, read_trace, synthetic_trace
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a window trace through the focus tracker")
+    parser.add_argument("--days", type=int, default=7, help="length of the synthetic trace")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the synthetic trace")
+    parser.add_argument("--trace", help="replay this trace file instead")
+    parser.add_argument("--heartbeat", type=float, default=focus_tracker.HEARTBEAT,
+                        help="seconds between the tracker's wake-ups in a stable window")
+    args = parser.parse_args()
+
+    events = read_trace(args.trace) if args.trace else synthetic_trace(args.days, args.seed)
+    span = events[-1][0] - events[0][0]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        proc, url = start_server(os.path.join(tmp, "app_data.json"), 4)
+        try:
+            focus_tracker.STATE_FILE = os.path.join(tmp, "character_state.txt")
+            focus_tracker.STATE_SLOT = os.path.join(tmp, "character_state.slot")
+            focus_tracker.STATE_URL = f"{url}/api/state"
+            focus_tracker.INTERVALS_URL = f"{url}/api/focus/intervals"
+            focus_tracker.HEARTBEAT = args.heartbeat
+            utils.notes = utils.NoteWriter(root=os.path.join(tmp, "Daily_Notes"))
+            utils.audio = utils.AudioLibrary(root=os.path.join(tmp, "audio_library"), backend="null")
+
+            clock = SimulatedClock(start=events[0][0])
+            source = ReplayWindowSource(events, clock)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                points = focus_tracker.track_focus(source, clock)
+                utils.notes.flush()
+            elapsed = time.perf_counter() - start
+
+            balance = request(f"{url}/api/points")["focus_points"]
+            first = datetime.fromtimestamp(events[0][0]).date()
+            days = (datetime.fromtimestamp(events[-1][0]).date() - first).days + 1
+            recorded = 0
+            for i in range(days):
+                day = (first + timedelta(days=i)).isoformat()
+                recorded += sum(request(f"{url}/api/focus/activity?date={day}")["by_category"].values())
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    changes = source.reads - 1
+    print(f"{span / 86400:.1f} simulated days, {changes} window changes")
+    print(f"replayed in {elapsed:.2f} s: {changes / elapsed:,.0f} events/s, {span / elapsed:,.0f}x real time")
+
+    ok = balance == points and abs(recorded - span) <= 1
+    print(f"{'✓' if ok else '✗'} tracker points {points}, server balance {balance}; "
+          f"intervals cover {recorded:,.0f} of {span:,.0f} s")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
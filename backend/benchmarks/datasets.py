@@ -0,0 +1,65 @@
+"""
+Synthetic app_data.json files for the benchmarks
+Entries are split evenly between sentiment, food and tasks and spread back
+in time from now, so date-range reads have something to filter
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+
+from data_store import DEFAULT_DATA, SEQ_KEY
+
+MOODS = ["happy", "calm", "tired", "anxious", "sad", "excited"]
+MEALS = ["breakfast", "lunch", "dinner", "snack"]
+
+
+def build_dataset(entries, now=None, spacing_minutes=20, seed=42):
+    """A data document (newest first where the app expects it) with ~`entries` entries"""
+    rng = random.Random(seed)
+    now = now or datetime.now()
+    data = json.loads(json.dumps(DEFAULT_DATA))
+    per_collection = max(1, entries // 3)
+
+    def stamp(i):
+        return (now - timedelta(minutes=spacing_minutes * i)).isoformat()
+
+    # i = 0 is the newest entry, which is what the file stores first
+    data['sentiment_entries'] = [{
+        'id': f"s{i}",
+        'date': stamp(i),
+        'mood': rng.choice(MOODS),
+        'color': f"#{rng.randrange(0x1000000):06x}",
+        'answers': ["ok", "fine"]
+    } for i in range(per_collection)]
+    data['food_entries'] = [{
+        'id': f"f{i}",
+        'date': stamp(i),
+        'time': "12:00",
+        'meal': rng.choice(MEALS),
+        'ate': rng.random() > 0.1
+    } for i in range(per_collection)]
+    # Tasks are stored oldest first with integer ids
+    data['tasks'] = [{
+        'id': i,
+        'text': f"Task {i}",
+        'completed': rng.random() > 0.5,
+        'created_at': stamp(per_collection - i)
+    } for i in range(per_collection)]
+    data['comfort_vault'] = [{
+        'id': f"c{i}",
+        'type': "quote",
+        'content': "You've got this",
+        'createdAt': stamp(i * 50)
+    } for i in range(min(per_collection, 100))]
+    data['focus_points'] = rng.randrange(0, 5000)
+    data[SEQ_KEY] = 0
+    return data
+
+
+def write_dataset(path, entries, **kwargs):
+    """Write a synthetic app_data.json; returns the number of entries written"""
+    data = build_dataset(entries, **kwargs)
+    with open(path, 'w') as f:
+        json.dump(data, f, separators=(',', ':'))
+    return sum(len(data[key]) for key in ('sentiment_entries', 'food_entries', 'tasks'))
@@ -0,0 +1,328 @@
+"""
+Load test for every route of the Touchgrass API
+
+For each dataset size it seeds a synthetic app_data.json and drives every
+route listed by GET / twice:
+  - in process, through the Flask test client (one request at a time)
+  - over HTTP, against ``api_server.py --serve`` with N concurrent workers
+Both run in a fresh process per size so peak RSS belongs to that size,
+with archiving off (TOUCHGRASS_HOT_DAYS=0) so every entry stays live and
+no archive run competes with the requests.
+
+The report (--out) is JSON with throughput, p50/p95/p99 latency, errors
+and peak RSS per route, so two versions can be diffed:
+
+    python -m benchmarks.load_test --sizes 1000 10000 100000 --out before.json
+    python -m benchmarks.load_test --sizes 1000 10000 100000 --out after.json
+    python -m benchmarks.load_test --compare before.json after.json
+
+Sizes up to 1000000 work but take a while (and a few GB of memory).
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from benchmarks.bench_concurrency import percentile, start_server
+from benchmarks.datasets import write_dataset
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Routes that read or rewrite the whole document get fewer requests
+HEAVY = {("GET", "/api/data"), ("POST", "/api/data"), ("GET", "/api/tasks")}
+
+
+def route_plan(entries):
+    """(method, route, build(i) -> (path, json body)) for every API route"""
+    tasks = max(1, entries // 3)
+    return [
+        ("GET", "/", lambda i: ("/", None)),
+        ("GET", "/api/status", lambda i: ("/api/status", None)),
+        ("GET", "/api/data", lambda i: ("/api/data", None)),
+        ("POST", "/api/data", lambda i: ("/api/data", "CURRENT_DOCUMENT")),
+        ("PATCH", "/api/data", lambda i: ("/api/data", {"ops": [{"op": "incr", "key": "focus_points", "by": 1}]})),
+        ("GET", "/api/changes", lambda i: ("/api/changes?since=0", None)),
+        ("GET", "/api/bootstrap", lambda i: (f"/api/bootstrap?mode={'work' if i % 2 else 'chill'}", None)),
+        ("POST", "/api/mode", lambda i: ("/api/mode", {"mode": "work" if i % 2 else "destress"})),
+        ("POST", "/api/tasks", lambda i: ("/api/tasks", {"text": f"bench task {i}"})),
+        ("PATCH", "/api/tasks/<int:task_id>", lambda i: (f"/api/tasks/{i % tasks}", None)),
+        ("DELETE", "/api/tasks/<int:task_id>", lambda i: (f"/api/tasks/{tasks - 1 - i}", None)),
+        ("GET", "/api/tasks", lambda i: ("/api/tasks" if i % 2 else "/api/tasks?limit=10", None)),
+        # Right after the read that builds the tasks date index: a remove and an
+        # add in one record must keep it in sync (see stale_indexes)
+        ("POST", "/api/batch", lambda i: ("/api/batch", {"operations": [
+            {"op": "delete_task", "id": i % tasks},
+            {"op": "add_task", "body": {"text": f"batch {i}"}},
+            {"op": "update_points", "body": {"change": 1}}]})),
+        ("GET", "/api/sentiment", lambda i: ("/api/sentiment?limit=20", None)),
+        ("POST", "/api/sentiment", lambda i: ("/api/sentiment", {"mood": "calm", "color": "#88ccaa"})),
+        ("GET", "/api/food", lambda i: ("/api/food?limit=20", None)),
+        ("POST", "/api/food", lambda i: ("/api/food", {"meal": "lunch", "ate": True})),
+        ("GET", "/api/comfort", lambda i: ("/api/comfort?limit=20", None)),
+        ("POST", "/api/comfort", lambda i: ("/api/comfort", {"type": "quote", "content": "breathe"})),
+        ("GET", "/api/points", lambda i: ("/api/points", None)),
+        ("POST", "/api/points", lambda i: ("/api/points", {"change": 1})),
+        ("GET", "/api/points/history", lambda i: ("/api/points/history?bucket=day&count=30", None)),
+        ("POST", "/api/focus/intervals", lambda i: ("/api/focus/intervals", {"intervals": [
+            {"start": "2026-01-01T09:00:00", "end": "2026-01-01T09:04:30", "title": f"bench {i % 20} - code",
+             "app": "code", "category": "work", "points": 54}]})),
+        ("GET", "/api/focus/activity", lambda i: ("/api/focus/activity?date=2026-01-01", None)),
+        ("POST", "/api/goal", lambda i: ("/api/goal", {"goal": f"goal {i}", "completed": False})),
+        ("POST", "/api/state", lambda i: ("/api/state", {"character_state": "happy" if i % 2 else "sad"})),
+        ("GET", "/api/events", lambda i: ("/api/events?mode=poll&timeout=0", None)),
+        ("GET", "/api/metrics", lambda i: ("/api/metrics", None)),
+        ("GET", "/assets/<path:filename>", lambda i: ("/assets/shimeji_chill.png", None)),
+    ]
+
+
+def summarize(timings, errors, elapsed):
+    return {
+        "requests": len(timings),
+        "errors": errors,
+        "throughput_rps": round(len(timings) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+    }
+
+
+def peak_rss_mb(pid=None):
+    """Peak resident memory of a process (this one by default), or None if unknown"""
+    if pid is None:
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            # kilobytes on Linux, bytes on macOS
+            return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+        except ImportError:
+            pid = os.getpid()
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process(pid).memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+
+# ============= IN PROCESS (child process) =============
+
+def run_in_process(entries, requests, result_path):
+    """Runs in a child whose TOUCHGRASS_DATA_FILE points at the seeded data"""
+    import api_server
+
+    client = api_server.app.test_client()
+    covered = {(method, rule) for method, rule, _ in route_plan(entries)}
+    missing = sorted(f"{method} {rule.rule}" for rule in api_server.app.url_map.iter_rules()
+                     if rule.endpoint != 'static'
+                     for method in rule.methods - {"HEAD", "OPTIONS"}
+                     if (method, rule.rule) not in covered)
+
+    routes = {}
+    for method, rule, build in route_plan(entries):
+        count = max(3, requests // 50) if (method, rule) in HEAVY else requests
+        timings, errors = [], 0
+        document = client.get('/api/data').get_json() if method == "POST" and rule == "/api/data" else None
+        start = time.perf_counter()
+        # Routes print a line per mutation; keep the child's output quiet
+        with contextlib.redirect_stdout(io.StringIO()):
+            for i in range(count):
+                path, body = build(i)
+                body = document if body == "CURRENT_DOCUMENT" else body
+                t = time.perf_counter()
+                response = client.open(path, method=method, json=body)
+                response.get_data()
+                timings.append((time.perf_counter() - t) * 1000)
+                errors += response.status_code >= 400
+        routes[f"{method} {rule}"] = summarize(timings, errors, time.perf_counter() - start)
+
+    with api_server.store.view():
+        stale_indexes = api_server.entry_index.stale()
+    api_server.store.close()
+    with open(result_path, 'w') as f:
+        json.dump({"routes": routes, "peak_rss_mb": peak_rss_mb(), "unbenchmarked_routes": missing,
+                   "stale_indexes": stale_indexes}, f)
+
+
+def in_process(data_file, entries, requests):
+    with tempfile.TemporaryDirectory() as tmp:
+        result_path = os.path.join(tmp, "result.json")
+        # Archiving off, as for the real server (see start_server)
+        env = dict(os.environ, TOUCHGRASS_DATA_FILE=data_file, TOUCHGRASS_HOT_DAYS="0")
+        subprocess.run([sys.executable, "-m", "benchmarks.load_test", "--child", str(entries),
+                        "--requests", str(requests), "--result", result_path],
+                       cwd=BACKEND_DIR, env=env, check=True, stdout=subprocess.DEVNULL)
+        with open(result_path) as f:
+            return json.load(f)
+
+
+# ============= REAL SERVER =============
+
+def http(url, method, body):
+    data = json.dumps(body).encode() if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    try:
+        with urllib.request.urlopen(req, timeout=120) as resp:
+            resp.read()
+            return resp.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def over_http(data_file, entries, requests, workers, threads):
+    proc, url = start_server(data_file, threads)
+    routes = {}
+    try:
+        for method, rule, build in route_plan(entries):
+            count = max(workers, requests // 50) if (method, rule) in HEAVY else requests
+            document = None
+            if method == "POST" and rule == "/api/data":
+                with urllib.request.urlopen(f"{url}/api/data") as resp:
+                    document = json.loads(resp.read())
+
+            def one(i):
+                path, body = build(i)
+                body = document if body == "CURRENT_DOCUMENT" else body
+                t = time.perf_counter()
+                status = http(url + path, method, body)
+                return (time.perf_counter() - t) * 1000, status >= 400
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(one, range(count)))
+            routes[f"{method} {rule}"] = summarize(
+                [t for t, _ in results], sum(e for _, e in results), time.perf_counter() - start)
+        rss = peak_rss_mb(proc.pid)
+    finally:
+        proc.terminate()
+        proc.wait()
+    return {"routes": routes, "peak_rss_mb": rss}
+
+
+# ============= REPORT =============
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def print_run(run):
+    print(f"\n{run['entries']} entries, {run['mode']}"
+          f"{'' if run['mode'] == 'test_client' else ' x' + str(run['workers'])}"
+          f", peak RSS {run['peak_rss_mb']} MB")
+    print(f"  {'route':<36} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for route, stats in run["routes"].items():
+        print(f"  {route:<36} {stats['throughput_rps']:>9} {stats['p50_ms']:>9} "
+              f"{stats['p95_ms']:>9} {stats['p99_ms']:>9} {stats['errors']:>7}")
+
+
+def compare(old_path, new_path):
+    """p95 latency and throughput change per route between two reports"""
+    with open(old_path) as f:
+        old = {(r["entries"], r["mode"]): r for r in json.load(f)["runs"]}
+    with open(new_path) as f:
+        new = {(r["entries"], r["mode"]): r for r in json.load(f)["runs"]}
+
+    for key in sorted(old.keys() & new.keys()):
+        print(f"\n{key[0]} entries, {key[1]}: peak RSS {old[key]['peak_rss_mb']} -> {new[key]['peak_rss_mb']} MB")
+        print(f"  {'route':<36} {'p95 ms':>19} {'change':>8} {'req/s':>21}")
+        for route, after in new[key]["routes"].items():
+            before = old[key]["routes"].get(route)
+            if not before:
+                print(f"  {route:<36} (new)")
+                continue
+            change = (after["p95_ms"] / before["p95_ms"] - 1) * 100 if before["p95_ms"] else 0
+            print(f"  {route:<36} {before['p95_ms']:>8} -> {after['p95_ms']:<8} {change:>+7.1f}% "
+                  f"{before['throughput_rps']:>9} -> {after['throughput_rps']:<9}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test every Touchgrass API route")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="entries per dataset")
+    parser.add_argument("--requests", type=int, default=200, help="requests per route")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent clients against the real server")
+    parser.add_argument("--threads", type=int, default=16, help="server worker threads")
+    parser.add_argument("--modes", nargs="+", default=["test_client", "server"], choices=["test_client", "server"])
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="diff two reports and exit")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.child is not None:
+        run_in_process(args.child, args.requests, args.result)
+        return
+
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec='seconds'),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "storage": os.environ.get("TOUCHGRASS_STORAGE", "json"),
+            "requests_per_route": args.requests,
+        },
+        "runs": []
+    }
+
+    failed = False
+    for size in args.sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            seed_path = os.path.join(tmp, "seed.json")
+            start = time.perf_counter()
+            entries = write_dataset(seed_path, size)
+            seed_seconds = round(time.perf_counter() - start, 2)
+
+            for mode in args.modes:
+                # Every mode starts from the same untouched copy of the data
+                data_file = os.path.join(tmp, f"{mode}.json")
+                shutil.copy(seed_path, data_file)
+                if mode == "test_client":
+                    result = in_process(data_file, entries, args.requests)
+                else:
+                    result = over_http(data_file, entries, args.requests, args.workers, args.threads)
+                run = {"entries": entries, "mode": mode, "workers": 1 if mode == "test_client" else args.workers,
+                       "seed_seconds": seed_seconds, **result}
+                report["runs"].append(run)
+                print_run(run)
+                if result.get("unbenchmarked_routes"):
+                    print(f"  ⚠ Not benchmarked: {', '.join(result['unbenchmarked_routes'])}")
+                if result.get("stale_indexes"):
+                    print(f"  ✗ Date index out of sync with the data: {', '.join(result['stale_indexes'])}")
+                    failed = True
+
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"\n✓ Report written to {args.out}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Window title classifier for the focus tracker
+Rules live in focus_rules.json: an ordered list of categories, each with a
+weight and a list of substrings and/or regexes. The first category with a
+match wins, so distractions are listed before work apps.
+
+    {"categories": [
+        {"name": "distraction", "weight": -1, "substrings": ["youtube"], "regexes": []},
+        {"name": "work", "weight": 1, "substrings": ["code"], "regexes": ["\\.py\\b"]}
+    ],
+     "scoring": {"per_seconds": 5, "comfort_threshold": -5}}
+
+Titles are lowercased before matching, so substrings should be lowercase.
+A weight is points per ``scoring.per_seconds`` seconds spent in the
+category; the "scoring" section is handed to scoring.ScoringEngine.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from data_store import file_identity
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RULES_FILE = os.environ.get("TOUCHGRASS_RULES_FILE", os.path.join(BASE_DIR, "focus_rules.json"))
+
+# Used when the rules file does not exist (same lists the tracker always had)
+DEFAULT_RULES = {
+    "categories": [
+        {"name": "distraction", "weight": -1,
+         "substrings": ["youtube", "instagram", "reddit", "netflix", "facebook", "twitter"]},
+        {"name": "work", "weight": 1,
+         "substrings": ["chrome", "code", "notepad", "word", "docs", "study"]},
+    ]
+}
+
+IDLE = ("idle", 0)
+
+
+def _trie_pattern(words):
+    """
+    One regex for "contains any of these words", shaped like a trie so the
+    engine checks each character once per depth instead of once per word.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def emit(node):
+        # A word ends here, so any longer word through this node adds nothing
+        if '' in node:
+            return ''
+        branches = [re.escape(ch) + emit(child) for ch, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+
+    return emit(trie) if trie else None
+
+
+class RuleSet:
+    """Compiled categories: one combined pattern per category, checked in order"""
+
+    def __init__(self, config):
+        self.categories = []
+        self.rule_count = 0
+        self.scoring = config.get("scoring", {})
+        for category in config.get("categories", []):
+            name = category["name"]
+            substrings = [s.lower() for s in category.get("substrings", []) if s]
+            regexes = category.get("regexes", [])
+            parts = []
+            trie = _trie_pattern(substrings)
+            if trie:
+                parts.append(trie)
+            for pattern in regexes:
+                try:
+                    re.compile(pattern)
+                except re.error as e:
+                    raise ValueError(f"bad regex {pattern!r} in {name}: {e}")
+                parts.append(f"(?:{pattern})")
+            if parts:
+                self.categories.append((name, category.get("weight", 0), re.compile('|'.join(parts))))
+            self.rule_count += len(substrings) + len(regexes)
+
+    def classify(self, title):
+        """(category, weight) for a lowercased title, IDLE if nothing matches"""
+        for name, weight, pattern in self.categories:
+            if pattern.search(title):
+                return name, weight
+        return IDLE
+
+
+class Classifier:
+    """
+    RuleSet loaded from a rules file and rebuilt when the file changes.
+
+    The file is stat'ed at most every ``check_interval`` seconds. A new
+    RuleSet is compiled off to the side and swapped in with one assignment,
+    so classify() never sees half-built rules; if the new file is broken
+    the old rules stay in place. ``version`` goes up on every reload.
+
+    Results are kept in an LRU of ``cache_size`` raw titles, emptied on
+    every reload. The normalised titles it hands out are interned, so a
+    title seen all day is one string object.
+    """
+
+    def __init__(self, path=RULES_FILE, check_interval=2.0, cache_size=512):
+        self.path = path
+        self.check_interval = check_interval
+        self.cache_size = cache_size
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cache = OrderedDict()
+        self._identity = None
+        self._checked = 0
+        self._reload_lock = threading.Lock()
+        self.rules = RuleSet(DEFAULT_RULES)
+        self.reload()
+
+    def reload(self):
+        """Recompile the rules from the file (or the defaults if it is missing)"""
+        identity = file_identity(self.path)
+        if identity:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                rules = RuleSet(json.load(f))
+        else:
+            rules = RuleSet(DEFAULT_RULES)
+        self.rules = rules
+        self._cache = OrderedDict()
+        self._identity = identity
+        self.version += 1
+        print(f"✓ Loaded {rules.rule_count} focus rules in {len(rules.categories)} categories")
+
+    def check_for_changes(self):
+        """Reload if the rules file changed since the last check"""
+        now = time.monotonic()
+        if now - self._checked < self.check_interval or not self._reload_lock.acquire(blocking=False):
+            return
+        try:
+            self._checked = now
+            identity = file_identity(self.path)
+            if identity != self._identity:
+                try:
+                    self.reload()
+                except Exception as e:
+                    self._identity = identity  # don't retry the same broken file every check
+                    print(f"Error loading focus rules: {e}")
+        finally:
+            self._reload_lock.release()
+
+    def lookup(self, title):
+        """(normalised title, category, weight) for a window title"""
+        self.check_for_changes()
+        cache = self._cache
+        result = cache.get(title)
+        if result:
+            self.hits += 1
+            cache.move_to_end(title)
+            return result
+
+        self.misses += 1
+        normalised = sys.intern(title.strip().lower())
+        result = (normalised,) + self.rules.classify(normalised)
+        cache[title] = result
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def classify(self, title):
+        """(category, weight) for a window title"""
+        return self.lookup(title)[1:]
+
+    def stats(self):
+        """Cache counters since startup"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "cached_titles": len(self._cache),
+            "rules_version": self.version,
+        }
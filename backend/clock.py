@@ -0,0 +1,46 @@
+"""
+Clocks for the focus tracker
+Everything in the tracker that reads the time or sleeps goes through a
+clock, so a replayed or synthetic window trace can run on simulated time
+as fast as the pipeline allows.
+
+- SystemClock:    the real time (default)
+- SimulatedClock: starts at a given timestamp; sleep() just moves it forward
+"""
+
+import time
+from datetime import datetime
+
+
+class SystemClock:
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+    def now(self):
+        return datetime.now()
+
+
+class SimulatedClock:
+    def __init__(self, start=None):
+        self._now = time.time() if start is None else start
+
+    def time(self):
+        return self._now
+
+    def monotonic(self):
+        return self._now
+
+    def sleep(self, seconds):
+        self._now += max(0, seconds)
+
+    def now(self):
+        return datetime.fromtimestamp(self._now)
+
+
+SYSTEM_CLOCK = SystemClock()
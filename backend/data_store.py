@@ -0,0 +1,779 @@
+"""
+In-memory data store for Touchgrass
+Loads the app data once, serves reads from memory and persists every change
+as a small mutation through a storage engine (JSON journal or SQLite)
+"""
+
+import atexit
+import copy
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Shared by main_app.py and api_server.py so both processes use the same file
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_FILE = os.environ.get("TOUCHGRASS_DATA_FILE", os.path.join(BASE_DIR, "..", "app_data.json"))
+
+DEFAULT_DATA = {
+    "user": None,
+    "current_mode": "selection",
+    "tasks": [],
+    "notes": [],
+    "reminders": [],
+    "daily_goal": "",
+    "daily_goal_completed": False,
+    "sentiment_entries": [],
+    "food_entries": [],
+    "focus_points": 0,
+    "comfort_vault": [],
+    "focus_history": [],
+    "focus_titles": []
+}
+
+# Collections clients and data files see newest first. In memory every
+# collection is kept in append order so adding an entry is O(1);
+# export_document()/import_document() convert at the edges.
+NEWEST_FIRST = ("sentiment_entries", "food_entries", "comfort_vault")
+
+# Key written into the snapshot so replay knows which journal records it holds
+SEQ_KEY = "_journal_seq"
+
+
+# ============= MUTATIONS =============
+#
+# Every change to the data is described by a small dict so it can be
+# journaled and replayed:
+#   {"op": "set",     "key": k, "value": v}
+#   {"op": "incr",    "key": k, "by": n}
+#   {"op": "add",     "key": collection, "item": {...}}
+#   {"op": "update",  "key": collection, "id": id, "fields": {...}}
+#   {"op": "remove",  "key": collection, "id": id}
+#   {"op": "prune",   "key": collection, "ids": [id, ...]}
+#   {"op": "replace", "value": {...whole document...}}
+
+def set_op(key, value):
+    return {"op": "set", "key": key, "value": value}
+
+def incr_op(key, by):
+    return {"op": "incr", "key": key, "by": by}
+
+def add_op(key, item):
+    return {"op": "add", "key": key, "item": item}
+
+def update_op(key, item_id, fields):
+    return {"op": "update", "key": key, "id": item_id, "fields": fields}
+
+def remove_op(key, item_id):
+    return {"op": "remove", "key": key, "id": item_id}
+
+def prune_op(key, item_ids):
+    return {"op": "prune", "key": key, "ids": list(item_ids)}
+
+def replace_op(value):
+    return {"op": "replace", "value": value}
+
+
+# Marks a key that was absent before a mutation (undo deletes it again)
+MISSING = object()
+
+
+def apply_mutation(data, mutation, undo=None):
+    """
+    Apply one mutation to the document in place. If ``undo`` is a list,
+    what is needed to take it back is appended to it (see undo_mutations)
+    """
+    op = mutation["op"]
+    key = mutation.get("key")
+    if undo is not None:
+        if op == "replace":
+            undo.append(("replace", dict(data)))
+        elif op == "add" and isinstance(data.get(key), list):
+            undo.append(("truncate", key, len(data[key])))
+        elif op != "update":
+            # set/incr swap the value; remove/prune build a new list
+            undo.append(("key", key, data.get(key, MISSING)))
+    if op == "set":
+        data[key] = mutation["value"]
+    elif op == "incr":
+        data[key] = data.get(key, 0) + mutation["by"]
+    elif op == "add":
+        # Copy so later updates don't rewrite the mutation kept for delta sync
+        data.setdefault(key, []).append(copy.deepcopy(mutation["item"]))
+    elif op == "update":
+        for item in data.get(key, []):
+            if item.get("id") == mutation["id"]:
+                if undo is not None:
+                    undo.append(("item", item, dict(item)))
+                item.update(mutation["fields"])
+                break
+    elif op == "remove":
+        items = data.get(key, [])
+        data[key] = [i for i in items if i.get("id") != mutation["id"]]
+    elif op == "prune":
+        # One pass for many ids (archiving), instead of one remove each
+        ids = set(mutation["ids"])
+        items = data.get(key, [])
+        data[key] = [i for i in items if i.get("id") not in ids]
+    elif op == "replace":
+        value = import_document(copy.deepcopy(mutation["value"]))
+        data.clear()
+        data.update(value)
+        with_defaults(data)
+    else:
+        raise ValueError(f"Unknown mutation: {op}")
+
+
+def undo_mutations(data, undo):
+    """Take back mutations applied with apply_mutation(..., undo), newest first"""
+    for entry in reversed(undo):
+        kind = entry[0]
+        if kind == "replace":
+            data.clear()
+            data.update(entry[1])
+        elif kind == "truncate":
+            del data[entry[1]][entry[2]:]
+        elif kind == "item":
+            entry[1].clear()
+            entry[1].update(entry[2])
+        elif entry[2] is MISSING:
+            data.pop(entry[1], None)
+        else:
+            data[entry[1]] = entry[2]
+    del undo[:]
+
+
+def validate_mutation(mutation):
+    """Reject malformed mutations before they reach the store (PATCH /api/data)"""
+    op = mutation.get("op") if isinstance(mutation, dict) else None
+    required = {
+        "set": ("key", "value"),
+        "incr": ("key", "by"),
+        "add": ("key", "item"),
+        "update": ("key", "id", "fields"),
+        "remove": ("key", "id"),
+        "prune": ("key", "ids"),
+        "replace": ("value",),
+    }.get(op)
+    if required is None:
+        raise ValueError(f"Unknown mutation: {op}")
+    missing = [field for field in required if field not in mutation]
+    if missing:
+        raise ValueError(f"Mutation '{op}' is missing {', '.join(missing)}")
+    if "key" in required and mutation["key"] not in DEFAULT_DATA:
+        raise ValueError(f"Unknown key: {mutation['key']}")
+    if op in ("add", "update", "remove", "prune") and not isinstance(DEFAULT_DATA[mutation["key"]], list):
+        raise ValueError(f"'{mutation['key']}' is not a collection")
+    if op == "prune" and not isinstance(mutation["ids"], list):
+        raise ValueError("'ids' must be a list")
+    if op == "add" and not isinstance(mutation["item"], dict):
+        raise ValueError("'item' must be an object")
+    if op == "update" and not isinstance(mutation["fields"], dict):
+        raise ValueError("'fields' must be an object")
+    if op == "replace" and not isinstance(mutation["value"], dict):
+        raise ValueError("'value' must be an object")
+    if op == "set":
+        expected = value_type_error(DEFAULT_DATA[mutation["key"]], mutation["value"])
+        if expected:
+            raise ValueError(f"'{mutation['key']}' must be {expected}")
+    if op == "incr":
+        if not is_number(mutation["by"]):
+            raise ValueError("'by' must be a number")
+        if not is_number(DEFAULT_DATA[mutation["key"]]):
+            raise ValueError(f"'{mutation['key']}' is not a number")
+
+
+def value_type_error(default, value):
+    """What ``value`` should have been to match its default's type, or None if it does"""
+    if isinstance(default, list):
+        ok, expected = isinstance(value, list) and all(isinstance(i, dict) for i in value), "a list of objects"
+    elif isinstance(default, bool):
+        ok, expected = isinstance(value, bool), "true or false"
+    elif is_number(default):
+        ok, expected = is_number(value), "a number"
+    elif isinstance(default, str):
+        ok, expected = isinstance(value, str), "a string"
+    else:
+        # "user": null until the profile is set up
+        ok, expected = value is None or isinstance(value, dict), "an object or null"
+    return None if ok else expected
+
+
+def is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def summarize_changes(records, data):
+    """
+    Turn committed records into a delta for sync clients:
+    changed scalar fields (with their current value) plus
+    insert/update/delete entries per collection, in commit order
+    """
+    fields = {}
+    changes = []
+    for seq, mutations in records:
+        for mutation in mutations:
+            op = mutation["op"]
+            key = mutation.get("key")
+            if op in ("set", "incr"):
+                fields[key] = data.get(key)
+            elif op == "add":
+                changes.append({"version": seq, "collection": key, "type": "insert", "record": mutation["item"]})
+            elif op == "update":
+                changes.append({"version": seq, "collection": key, "type": "update",
+                                "id": mutation["id"], "fields": mutation["fields"]})
+            elif op == "remove":
+                changes.append({"version": seq, "collection": key, "type": "delete", "id": mutation["id"]})
+            elif op == "prune":
+                changes.extend({"version": seq, "collection": key, "type": "delete", "id": item_id}
+                               for item_id in mutation["ids"])
+    return {"fields": fields, "changes": changes}
+
+
+def export_document(data):
+    """In-memory data -> the document shape clients and data files use (newest first)"""
+    doc = dict(data)
+    for key in NEWEST_FIRST:
+        if isinstance(doc.get(key), list):
+            doc[key] = doc[key][::-1]
+    return doc
+
+
+def import_document(doc):
+    """Document from a client or data file -> in-memory (append ordered) data"""
+    return export_document(doc)
+
+
+def entry_date(item):
+    """The timestamp an entry is indexed by (field name differs per collection)"""
+    if not isinstance(item, dict):
+        return None
+    return item.get('date') or item.get('createdAt') or item.get('created_at')
+
+
+def with_defaults(data):
+    """Add any fields missing from an older data file"""
+    for key, value in DEFAULT_DATA.items():
+        if key not in data:
+            data[key] = copy.deepcopy(value)
+    return data
+
+
+def atomic_write(path, payload):
+    """Write a file via temp file + rename so readers never see it half written"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb' if isinstance(payload, bytes) else 'w') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class FileLock:
+    """
+    Exclusive lock shared by every process using the same data file.
+
+    Re-entrant within a process: threads are serialised by an RLock and
+    only the outermost acquisition takes the OS-level lock (flock on POSIX,
+    msvcrt.locking on Windows).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT)
+
+    def __enter__(self):
+        self._thread_lock.acquire()
+        self._depth += 1
+        if self._depth == 1:
+            try:
+                self._lock_fd()
+            except Exception:
+                self._depth -= 1
+                self._thread_lock.release()
+                raise
+        return self
+
+    def __exit__(self, *exc):
+        self._depth -= 1
+        if self._depth == 0:
+            self._unlock_fd()
+        self._thread_lock.release()
+
+    def _lock_fd(self):
+        if fcntl:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            return
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        while True:
+            try:
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # LK_LOCK gives up after ~10 seconds; keep waiting
+                continue
+
+    def _unlock_fd(self):
+        if fcntl:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    def close(self):
+        os.close(self._fd)
+
+
+def file_identity(path):
+    """(device, inode, mtime, size) of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+# ============= STORAGE ENGINES =============
+#
+# An engine persists committed records and tells the store when another
+# process has written to the same storage:
+#   load()                        -> (data, seq)
+#   locked()                      cross-process write section (re-entrant)
+#   changes_since(seq)            -> new records, [] if unchanged, None to reload
+#   append(seq, mutations, data)  persist one record (inside locked())
+#   wants_compaction() / compact(store) / close()
+
+class JsonJournalEngine:
+    """
+    Persists the data as a JSON snapshot plus an append-only journal.
+
+    Each commit is appended as one JSON line to ``<data file>.journal`` so a
+    write costs a tiny sequential append instead of a rewrite of the whole
+    document. Once the journal grows past ``compact_bytes`` it is folded
+    into a new snapshot written via temp file + atomic rename.
+
+    Other processes are detected by stat alone: new journal bytes are read
+    and replayed incrementally, while a replaced snapshot or rotated journal
+    triggers a full reload.
+    """
+
+    def __init__(self, path, compact_bytes=1024 * 1024, fsync=True):
+        self.path = path
+        self.journal_path = f"{path}.journal"
+        self.compact_bytes = compact_bytes
+        self.fsync = fsync
+        self.file_lock = FileLock(f"{path}.lock")
+        self._journal = None
+        self._offset = 0
+        self._snapshot_id = None
+        self._journal_id = None
+
+    def locked(self):
+        return self.file_lock
+
+    def load(self):
+        """Read the last snapshot and replay the journal on top of it"""
+        with self.file_lock:
+            if not os.path.exists(self.path):
+                data = copy.deepcopy(DEFAULT_DATA)
+                atomic_write(self.path, json.dumps(data, indent=2))
+                print(f"✓ Created {self.path}")
+            else:
+                # Snapshots are only ever replaced atomically, so a parse error
+                # here is real corruption and must not be papered over with defaults
+                with open(self.path, 'r') as f:
+                    data = import_document(json.load(f))
+                with_defaults(data)
+
+            seq = data.pop(SEQ_KEY, 0)
+            seq, replayed = self._replay(data, seq)
+            if replayed and self._journal is None:
+                print(f"✓ Replayed {replayed} journal records")
+            self._reopen_journal()
+        return data, seq
+
+    def _replay(self, data, seq):
+        """Apply journal records newer than the snapshot; drop a torn tail"""
+        if not os.path.exists(self.journal_path):
+            return seq, 0
+
+        replayed = 0
+        good_offset = 0
+        with open(self.journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"⚠ Ignoring torn journal record at byte {good_offset}")
+                    break
+                good_offset += len(line)
+                if record["seq"] <= seq:
+                    continue
+                for mutation in record["ops"]:
+                    apply_mutation(data, mutation)
+                seq = record["seq"]
+                replayed += 1
+
+        if good_offset != os.path.getsize(self.journal_path):
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(good_offset)
+        return seq, replayed
+
+    def _reopen_journal(self):
+        if self._journal:
+            self._journal.close()
+        # Binary, so offsets are byte counts on every platform (text mode
+        # would write \r\n on Windows)
+        self._journal = open(self.journal_path, 'ab')
+        self._offset = self._journal.tell()
+        self._remember_files()
+
+    def _remember_files(self):
+        self._snapshot_id = file_identity(self.path)
+        journal_id = file_identity(self.journal_path)
+        self._journal_id = journal_id[:2] if journal_id else None
+
+    def changes_since(self, seq):
+        """Journal records written by other processes since we last looked"""
+        if file_identity(self.path) != self._snapshot_id:
+            return None
+        journal_id = file_identity(self.journal_path)
+        if not journal_id or journal_id[:2] != self._journal_id or journal_id[3] < self._offset:
+            return None
+        if journal_id[3] == self._offset:
+            return []
+
+        records = []
+        try:
+            f = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            return None
+        with f:
+            # Another process may have compacted since the stat above; only
+            # seek into the journal we have been reading
+            st = os.fstat(f.fileno())
+            if (st.st_dev, st.st_ino) != self._journal_id or st.st_size < self._offset:
+                return None
+            f.seek(self._offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # another process is mid-append; pick it up next time
+                self._offset += len(line)
+                record = json.loads(line)
+                if record["seq"] > seq:
+                    records.append(record)
+        return records
+
+    def append(self, seq, mutations, data):
+        """Journal one committed record"""
+        line = (json.dumps({"seq": seq, "ops": mutations}, separators=(',', ':')) + "\n").encode('utf-8')
+        try:
+            self._journal.write(line)
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+        except BaseException:
+            # Don't leave half a record for the next append to follow
+            try:
+                self._journal.truncate(self._offset)
+            except OSError:
+                pass
+            raise
+        self._offset += len(line)
+
+    def wants_compaction(self):
+        return self._offset >= self.compact_bytes
+
+    def compact(self, store):
+        """Fold the journal into a new snapshot of the data file"""
+        with store.lock, self.file_lock:
+            store.refresh()
+            if self._offset == 0:
+                return
+            snapshot = export_document(store.data)
+            snapshot[SEQ_KEY] = store.seq
+            payload = json.dumps(snapshot, indent=2)
+            compacted_offset = self._offset
+            journal_id = self._journal_id
+
+        # The snapshot is serialised to disk outside every lock so requests
+        # (and other processes) keep flowing; only the swap is locked
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+
+        with store.lock, self.file_lock:
+            current = file_identity(self.journal_path)
+            if not current or current[:2] != journal_id or current[3] < compacted_offset:
+                # Another process compacted in the meantime
+                os.remove(tmp_path)
+                return
+            # Catch up on records other processes appended meanwhile; they
+            # stay in the journal tail below
+            store.refresh()
+            os.replace(tmp_path, self.path)
+            # Keep whatever was journaled while the snapshot was being written
+            with open(self.journal_path, 'rb') as f:
+                f.seek(compacted_offset)
+                tail = f.read()
+            self._journal.close()
+            self._journal = None
+            atomic_write(self.journal_path, tail)
+            self._reopen_journal()
+
+    def close(self):
+        if self._journal:
+            self._journal.close()
+        self.file_lock.close()
+
+
+class DataStore:
+    """
+    Authoritative, in-memory copy of the app data for one process.
+
+    ``commit()`` takes the engine's cross-process lock, catches up with
+    anything other processes committed, applies the mutations in memory and
+    hands them to the engine as one record. Reads only stat the storage to
+    check for outside changes. Listeners registered with ``subscribe()``
+    are called with ``(seq, mutations)`` after every change, local or not
+    (``mutations`` is None after a full reload). ``close()`` compacts one
+    last time and is registered with ``atexit``.
+    """
+
+    def __init__(self, engine, history=1000):
+        self.engine = engine
+        self.lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._wakeup = threading.Condition(self.lock)
+        self._closing = False
+        self._closed = False
+        self._listeners = []
+        self._watcher = None
+        self._txn = None
+        self._txn_undo = None
+        # Recent (seq, mutations) records, for delta sync
+        self._recent = deque(maxlen=history)
+
+        self.data, self.seq = engine.load()
+
+        self._compactor = threading.Thread(target=self._compact_loop, daemon=True)
+        self._compactor.start()
+        atexit.register(self.close)
+
+    # ---------- coherence ----------
+
+    def subscribe(self, callback):
+        """Call ``callback(seq, mutations)`` whenever the data changes"""
+        self._listeners.append(callback)
+
+    def _notify(self, mutations):
+        for callback in list(self._listeners):
+            try:
+                callback(self.seq, mutations)
+            except Exception as e:
+                print(f"Error in store listener: {e}")
+
+    def refresh(self):
+        """Pick up changes from other processes; a stat call when nothing changed"""
+        with self.lock:
+            if self._closed:
+                return
+            records = self.engine.changes_since(self.seq)
+            if records is None:
+                self._reload()
+                return
+            for record in records:
+                for mutation in record["ops"]:
+                    apply_mutation(self.data, mutation)
+                self.seq = record["seq"]
+                self._remember(record["ops"])
+                self._notify(record["ops"])
+
+    def watch(self, interval=0.5):
+        """Start a background thread that refreshes every ``interval`` seconds"""
+        if self._watcher:
+            return
+
+        def loop():
+            while not self._closed:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Error refreshing store: {e}")
+                time.sleep(interval)
+
+        self._watcher = threading.Thread(target=loop, daemon=True)
+        self._watcher.start()
+
+    # ---------- reads and writes ----------
+
+    @contextmanager
+    def view(self):
+        """Hold the store lock while reading (e.g. serialising) the data"""
+        with self.lock:
+            self.refresh()
+            yield self.data
+
+    def commit(self, mutations):
+        """Apply mutations in memory and persist them as a single record (all or nothing)"""
+        mutations = list(mutations)
+        if not mutations:
+            return self.seq
+        with self.lock, self.engine.locked():
+            if self._txn is not None:
+                # Inside transaction(): apply now, persist with the rest later
+                self._txn_undo.extend(self._apply(mutations))
+                self._txn.extend(mutations)
+                return self.seq + 1
+            self.refresh()
+            undo = self._apply(mutations)
+            try:
+                return self._persist(mutations)
+            except BaseException:
+                undo_mutations(self.data, undo)
+                raise
+
+    def _apply(self, mutations):
+        """Apply all of the mutations in memory or none of them; returns the undo list"""
+        undo = []
+        try:
+            for mutation in mutations:
+                apply_mutation(self.data, mutation, undo)
+        except BaseException:
+            undo_mutations(self.data, undo)
+            raise
+        return undo
+
+    def _persist(self, mutations):
+        # The seq only moves once the record is safely stored
+        self.engine.append(self.seq + 1, mutations, self.data)
+        self.seq += 1
+        if self.engine.wants_compaction():
+            self._wakeup.notify()
+        self._remember(mutations)
+        self._notify(mutations)
+        return self.seq
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group every commit() made inside the block into one record.
+
+        Commits are applied in memory straight away so later steps see
+        earlier ones, but nothing is persisted or announced until the block
+        ends. If it raises, the block's commits are taken back in memory
+        and none of them happened.
+        """
+        with self.lock, self.engine.locked():
+            if self._txn is not None:
+                yield self
+                return
+            self.refresh()
+            self._txn, self._txn_undo = [], []
+            try:
+                yield self
+                if self._txn:
+                    self._persist(self._txn)
+            except BaseException:
+                undo_mutations(self.data, self._txn_undo)
+                raise
+            finally:
+                self._txn = self._txn_undo = None
+
+    def _reload(self):
+        with self.engine.locked():
+            data, self.seq = self.engine.load()
+        # Keep the same dict so references held by callers stay live
+        self.data.clear()
+        self.data.update(data)
+        self._recent.clear()
+        self._notify(None)
+
+    def _remember(self, mutations):
+        if any(m["op"] == "replace" for m in mutations):
+            # A whole-document swap cannot be expressed as a delta
+            self._recent.clear()
+        else:
+            self._recent.append((self.seq, mutations))
+
+    def records_since(self, seq):
+        """Records committed after ``seq``, or None if they are no longer known"""
+        with self.lock:
+            self.refresh()
+            if seq == self.seq:
+                return []
+            if seq > self.seq or not self._recent or self._recent[0][0] > seq + 1:
+                return None
+            return [record for record in self._recent if record[0] > seq]
+
+    def replace(self, data):
+        """Swap in a whole new document (used by POST /api/data)"""
+        return self.commit([replace_op(data)])
+
+    # ---------- compaction ----------
+
+    def compact(self):
+        with self._io_lock:
+            self.engine.compact(self)
+
+    def _compact_loop(self):
+        while True:
+            with self.lock:
+                while not self._closed and not self.engine.wants_compaction():
+                    self._wakeup.wait()
+                if self._closed:
+                    return
+            try:
+                self.compact()
+            except Exception as e:
+                print(f"Error compacting storage: {e}")
+                time.sleep(1)
+
+    def close(self):
+        """Stop the background threads and write a final snapshot"""
+        with self.lock:
+            if self._closing:
+                return
+            self._closing = True
+        self.compact()
+        with self.lock:
+            self._closed = True
+            self._wakeup.notify_all()
+        # The compactor may still be mid-compaction; let it finish before
+        # the engine's files and lock go away
+        if self._compactor is not threading.current_thread():
+            self._compactor.join()
+        with self._io_lock, self.lock:
+            self.engine.close()
+
+
+# ============= CONFIG =============
+
+# "json" (snapshot + journal, the default) or "sqlite"
+STORAGE_BACKEND = os.environ.get("TOUCHGRASS_STORAGE", "json")
+
+
+def open_store(json_path=DATA_FILE, backend=None):
+    """Create a DataStore for the configured storage backend"""
+    backend = backend or STORAGE_BACKEND
+    if backend == "json":
+        return DataStore(JsonJournalEngine(json_path))
+    if backend == "sqlite":
+        from sqlite_store import SqliteEngine, default_db_path, migrate_json
+        db_path = default_db_path(json_path)
+        if not os.path.exists(db_path) and os.path.exists(json_path):
+            migrate_json(json_path, db_path)
+        return DataStore(SqliteEngine(db_path))
+    raise ValueError(f"Unknown storage backend: {backend}")
@@ -0,0 +1,135 @@
+"""
+Date index over the entry collections
+Lets the API answer "latest N" and date-range reads with a bisect and a
+slice instead of serialising a whole collection
+"""
+
+import base64
+import bisect
+import json
+
+from data_store import entry_date
+
+# Fields whose change moves an entry within the date order
+DATE_FIELDS = ("date", "createdAt", "created_at")
+
+
+def encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        date, pos = json.loads(base64.urlsafe_b64decode(padded))
+        return (str(date), int(pos))
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+
+class EntryIndex:
+    """
+    Sorted ``(date, position)`` keys per collection, kept in sync with a
+    DataStore through its change notifications.
+
+    Collections are append ordered in memory, so a new entry almost always
+    lands at the end of the index (an O(1) append; older-dated entries are
+    insorted). Anything that shifts positions (remove, set, reload) drops
+    the collection's index and it is rebuilt on the next read.
+    """
+
+    def __init__(self, store, collections):
+        self.store = store
+        self._keys = {name: None for name in collections}
+        store.subscribe(self._on_change)
+
+    def _on_change(self, seq, mutations):
+        if mutations is None:
+            for name in self._keys:
+                self._keys[name] = None
+            return
+
+        added = {}
+        for mutation in mutations:
+            name = mutation.get("key")
+            if name not in self._keys:
+                continue
+            if mutation["op"] == "add":
+                # After a remove/set in the same record the collection is rebuilt anyway
+                if added.get(name, []) is not None:
+                    added.setdefault(name, []).append(mutation["item"])
+            elif mutation["op"] == "update" and not any(f in mutation["fields"] for f in DATE_FIELDS):
+                continue
+            else:
+                added[name] = None
+
+        for name, items in added.items():
+            keys = self._keys[name]
+            if keys is None:
+                continue
+            if items is None:
+                self._keys[name] = None
+                continue
+            # The adds are already applied, so they are the last len(items) entries
+            first_pos = len(self.store.data[name]) - len(items)
+            for offset, item in enumerate(items):
+                key = (entry_date(item) or "", first_pos + offset)
+                if not keys or key >= keys[-1]:
+                    keys.append(key)
+                else:
+                    bisect.insort(keys, key)
+
+    def _index(self, name):
+        keys = self._keys[name]
+        if keys is None:
+            items = self.store.data.get(name, [])
+            keys = sorted((entry_date(item) or "", pos) for pos, item in enumerate(items))
+            self._keys[name] = keys
+        return keys
+
+    def stale(self):
+        """Collections whose index no longer matches a fresh rebuild (checked by load_test.py)"""
+        names = []
+        for name, keys in self._keys.items():
+            items = self.store.data.get(name, [])
+            if keys is not None and keys != sorted((entry_date(item) or "", pos) for pos, item in enumerate(items)):
+                names.append(name)
+        return names
+
+    def page(self, name, start=None, end=None, limit=20, cursor=None, descending=True):
+        """
+        Like query() but returns ``(keys, items, more)``, so a caller can
+        merge the page with entries from elsewhere (the archive).
+        """
+        keys = self._index(name)
+        items = self.store.data.get(name, [])
+
+        lo = bisect.bisect_left(keys, (start,)) if start else 0
+        # "to" is inclusive of the whole day/timestamp prefix it names
+        hi = bisect.bisect_left(keys, (end + "\uffff",)) if end else len(keys)
+
+        if cursor:
+            after = decode_cursor(cursor)
+            if descending:
+                hi = min(hi, bisect.bisect_left(keys, after))
+            else:
+                lo = max(lo, bisect.bisect_right(keys, after))
+
+        if descending:
+            page = keys[max(lo, hi - limit):hi][::-1]
+            more = hi - limit > lo
+        else:
+            page = keys[lo:min(hi, lo + limit)]
+            more = lo + limit < hi
+
+        return page, [items[pos] for _, pos in page], more
+
+    def query(self, name, start=None, end=None, limit=20, cursor=None, descending=True):
+        """
+        One page of entries dated within [start, end], newest first unless
+        ``descending`` is False. Returns ``(items, next_cursor)``.
+        Call with the store lock held (inside ``store.view()``).
+        """
+        page, items, more = self.page(name, start, end, limit, cursor, descending)
+        next_cursor = encode_cursor(list(page[-1])) if more and page else None
+        return items, next_cursor
@@ -0,0 +1,67 @@
+"""
+Change events for Touchgrass
+An in-process hub the API server publishes character state, focus point and
+mode changes to (streamed to clients by GET /api/events)
+"""
+
+import json
+import threading
+from collections import deque
+
+
+class EventHub:
+    """
+    Latest value per event kind, numbered by a sequence counter.
+
+    ``publish()`` ignores values that did not change, so subscribers only
+    wake up for real transitions. ``wait()`` blocks until something newer
+    than ``since`` exists and returns it; a reader that fell too far behind
+    (or is new) gets the current value of every kind instead. Callbacks
+    added with ``add_listener()`` are called with the new sequence number
+    (used to wake asyncio waiters without a thread each).
+    """
+
+    def __init__(self, history=256):
+        self._cond = threading.Condition()
+        self._history = deque(maxlen=history)
+        self.latest = {}
+        self.seq = 0
+        self._listeners = []
+
+    def add_listener(self, callback):
+        self._listeners.append(callback)
+
+    def publish(self, kind, payload):
+        with self._cond:
+            if self.latest.get(kind, (None, None))[1] == payload:
+                return
+            self.seq += 1
+            self.latest[kind] = (self.seq, payload)
+            self._history.append((self.seq, kind, payload))
+            self._cond.notify_all()
+            for callback in self._listeners:
+                callback(self.seq)
+
+    def get(self, kind, default=None):
+        entry = self.latest.get(kind)
+        return entry[1] if entry else default
+
+    def events_since(self, since):
+        """Events after ``since``, or a snapshot of every kind if that is unknown"""
+        with self._cond:
+            if since is None or (self._history and since < self._history[0][0] - 1) or since > self.seq:
+                return sorted((seq, kind, payload) for kind, (seq, payload) in self.latest.items())
+            return [event for event in self._history if event[0] > since]
+
+    def wait(self, since, timeout):
+        """Block up to ``timeout`` seconds for events newer than ``since``"""
+        with self._cond:
+            if since is not None:
+                self._cond.wait_for(lambda: self.seq != since, timeout)
+            return self.events_since(since)
+
+
+def format_sse(seq, kind, payload):
+    """One Server-Sent Events frame"""
+    return f"id: {seq}\nevent: {kind}\ndata: {json.dumps(payload)}\n\n"
+
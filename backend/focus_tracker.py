@@ -1,84 +1,215 @@
 # focus_tracker.py
 
-import pygetwindow as gw
-import time
-from utils import play_comfort_audio, play_voice_note, save_note
-
-def track_focus():
+import json
+import urllib.request
+from classifier import Classifier
+from clock import SYSTEM_CLOCK
+from data_store import atomic_write
+from scoring import ScoringEngine
+from state_channel import STATE_SLOT_FILE, StateSlot
+from utils import play_comfort_audio, play_voice_note, preload_audio, save_note
+from window_source import SourceClosed, open_window_source
+
+STATE_FILE = "../character_state.txt"
+STATE_SLOT = STATE_SLOT_FILE
+STATE_URL = "http://localhost:5000/api/state"
+INTERVALS_URL = "http://localhost:5000/api/focus/intervals"
+
+# Activity is recorded as intervals (one per stretch of time in one window,
+# with the points earned in it) and sent to the ledger at most this often
+# (seconds)
+POINTS_REPORT_INTERVAL = 60
+
+# Longer stretches are split into intervals of this many seconds so the
+# points balance keeps up while you stay in one window
+INTERVAL_MAX = 300
+
+# Wake up at least this often (seconds) for break reminders and points reports
+HEARTBEAT = 30
+
+# While distracted below the comfort threshold, comfort audio plays at most this often (seconds)
+COMFORT_REPEAT = 300
+
+# How often (seconds) the classifier's cache hit rate is printed
+CACHE_STATS_INTERVAL = 3600
+
+_slot = None
+
+def publish_state(character_state):
+    """
+    Publish a state change: the state file (replaced atomically, so readers
+    never see it empty), the local shared-memory slot, and the API's event
+    stream
+    """
+    global _slot
+    atomic_write(STATE_FILE, character_state)
+    if _slot is None:
+        _slot = StateSlot(STATE_SLOT)
+    _slot.publish(character_state)
+    try:
+        req = urllib.request.Request(STATE_URL, data=json.dumps({"character_state": character_state}).encode(),
+                                     headers={"Content-Type": "application/json"})
+        urllib.request.urlopen(req, timeout=0.5).close()
+    except Exception:
+        pass  # API server not running; the state file is still up to date
+
+def report_intervals(intervals):
+    """Add finished intervals (and their points) to the shared ledger; False if the API is down"""
+    try:
+        req = urllib.request.Request(INTERVALS_URL, data=json.dumps({"intervals": intervals}).encode(),
+                                     headers={"Content-Type": "application/json"})
+        urllib.request.urlopen(req, timeout=2).close()
+        return True
+    except Exception:
+        return False
+
+def app_name(title):
+    """The app part of a window title ("main.py - visual studio code" -> "visual studio code")"""
+    return title.rsplit(" - ", 1)[-1].strip()[:64] or title[:64]
+
+def close_interval(interval, end):
+    """An open interval as the JSON the intervals endpoint takes"""
+    return dict(interval, start=interval["start"].isoformat(timespec='seconds'),
+                end=end.isoformat(timespec='seconds'))
+
+def track_focus(source=None, clock=SYSTEM_CLOCK):
     """
     Main loop for FocusBuddy:
     - Tracks work vs distraction windows
-    - Updates points
+    - Scores time spent per window category (scoring.py; reported to the
+      API's points ledger as activity intervals)
     - Plays comfort audio or voice notes
     - Saves daily notes
-    - Sends character state to frontend via character_state.txt
+    - Sends character state changes to the frontend (character_state.txt,
+      the state_channel slot and the API)
+
+    Sleeps until the window source reports a change (or HEARTBEAT seconds
+    pass), so a long stretch in one window costs no work beyond the
+    source's own checks. Runs until the source closes (the end of a
+    replayed trace, see window_trace.py), then reports what is left and
+    returns the final points.
     """
 
     points = 0
-    break_timer = time.time()
-
-    # Thresholds
-    comfort_threshold = -5
-    negative_reward_threshold = -10
-
-    # Apps
-    work_apps = ["chrome", "code", "notepad", "word", "docs", "study"]
-    distractions = ["youtube", "instagram", "reddit", "netflix", "facebook", "twitter"]
+    break_timer = clock.time()
+    last_state = None
+    interval = None
+    unreported_intervals = []
+    last_report = clock.time()
+    last_stats = clock.time()
+    last_comfort = None
+    warned = False
+    closing = False
+
+    # Work apps, distractions and scoring settings (focus_rules.json, reloaded when it changes)
+    classifier = Classifier()
+    scoring = ScoringEngine(classifier.rules.scoring, start=clock.time())
+
+    preload_audio()
+    source = source or open_window_source()
+    title = source.title
+    changed = True
+    category, weight = None, 0
 
     while True:
         try:
-            win = gw.getActiveWindow()
-            title = win.title.lower() if win else "idle"
-            print("Current window:", title)
-
-            character_state = "idle"
-
-            # 1️⃣ Distraction check
-            if any(app in title for app in distractions):
-                points -= 1
+            # 1️⃣ Score the time spent in the window we were in (whole points; fractions carry over)
+            scoring.configure(classifier.rules.scoring)
+            scoring.advance(clock.time(), weight, category)
+            change = scoring.take_points()
+            if change:
+                points += change
+                interval["points"] += change
+
+            title, category, weight = classifier.lookup(title)
+            if changed:
+                print("Current window:", title)
+
+            # Close the interval on a switch (or when it gets long) and start the next one
+            now = clock.now()
+            if interval and (changed or closing or (now - interval["start"]).total_seconds() >= INTERVAL_MAX):
+                unreported_intervals.append(close_interval(interval, now))
+                interval = None
+            if interval is None and not closing:
+                interval = {"start": now, "title": title, "app": app_name(title), "category": category, "points": 0}
+
+            # 2️⃣ Distraction check
+            if weight < 0:
                 character_state = "sad"
-                print(f"❌ Distracted | Points: {points}")
-                save_note(f"Distracted: {title}")
+                if changed:
+                    print(f"❌ Distracted | Points: {points}")
+                    save_note(f"Distracted: {title}")
 
-                if points <= comfort_threshold:
+                if scoring.below("comfort_threshold") and (
+                        last_comfort is None or clock.time() - last_comfort >= COMFORT_REPEAT):
                     # Randomly choose between comfort audio or voice note
-                    if points % 2 == 0:
+                    if int(scoring.score) % 2 == 0:
                         play_comfort_audio()
                     else:
                         play_voice_note()
+                    last_comfort = clock.time()
 
-            # 2️⃣ Work apps check
-            elif any(app in title for app in work_apps):
-                points += 1
+            # 3️⃣ Work apps check
+            elif weight > 0:
                 character_state = "happy"
-                print(f"✅ Working | Points: {points}")
-                save_note(f"Working on: {title}")
+                if changed:
+                    print(f"✅ Working | Points: {points}")
+                    save_note(f"Working on: {title}")
 
-            # 3️⃣ Idle
+            # 4️⃣ Idle
             else:
-                print("🛌 Idle...")
                 character_state = "idle"
+                if changed:
+                    print("🛌 Idle...")
 
-            # 4️⃣ Break reminder every 45 minutes
-            if time.time() - break_timer > 2700:
+            # 5️⃣ Break reminder every 45 minutes
+            if clock.time() - break_timer > 2700:
                 print("🧘 Time for a break!")
                 play_comfort_audio()
-                break_timer = time.time()
-
-            # 5️⃣ Negative reward warning
-            if points <= negative_reward_threshold:
-                print("⚠ Avoid distractions for 10 minutes!")
+                break_timer = clock.time()
 
-            # 6️⃣ Update character state for frontend animations
-            with open("../character_state.txt", "w") as f:
-                f.write(character_state)
-
-            # 7️⃣ Wait 5 seconds before next check
-            time.sleep(5)
+            # 6️⃣ Negative reward warning (once each time the score drops past it)
+            if scoring.below("negative_reward_threshold"):
+                if not warned:
+                    print("⚠ Avoid distractions for 10 minutes!")
+                warned = True
+            else:
+                warned = False
+
+            # 7️⃣ Update character state for frontend animations (only on change)
+            if character_state != last_state:
+                publish_state(character_state)
+                last_state = character_state
+
+            # 8️⃣ Send finished intervals to the ledger (kept for later if the API is down)
+            if unreported_intervals and (closing or clock.time() - last_report >= POINTS_REPORT_INTERVAL):
+                if report_intervals(unreported_intervals):
+                    unreported_intervals = []
+                last_report = clock.time()
+
+            if clock.time() - last_stats >= CACHE_STATS_INTERVAL:
+                stats = classifier.stats()
+                print(f"📊 Title cache: {stats['hit_rate']:.1%} hits, {stats['cached_titles']} titles cached")
+                last_stats = clock.time()
+
+            if closing:
+                return points
+
+            # 9️⃣ Wait for the next window change
+            try:
+                new_title = source.wait(HEARTBEAT)
+            except SourceClosed:
+                # One more pass to score and report the last stretch
+                closing, new_title = True, None
+            changed = new_title is not None
+            if changed:
+                title = new_title
 
         except Exception as e:
             print("Error:", e)
-            time.sleep(5)
+            if closing:
+                return points
+            clock.sleep(5)
 
 
 # Allows running directly for testing
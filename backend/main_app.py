@@ -6,12 +6,14 @@ Combines the Shimeji character with full productivity/wellness features
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from PIL import Image, ImageTk
-import json
 import os
 from datetime import datetime
 import threading
 import time
 
+from data_store import DATA_FILE, open_store, export_document, set_op, add_op, update_op
+from state_channel import follow_state
+
 class ProductivityWellnessApp:
     def __init__(self):
         self.root = tk.Tk()
@@ -19,8 +21,8 @@ class ProductivityWellnessApp:
         self.root.geometry("1400x900")
         self.root.configure(bg="#f5f5f5")
         
-        # Data storage
-        self.data_file = "app_data.json"
+        # Data storage (same file as api_server.py)
+        self.data_file = DATA_FILE
         self.load_data()
         
         # Current mode
@@ -56,41 +58,37 @@ class ProductivityWellnessApp:
         self.root.mainloop()
     
     def load_data(self):
-        """Load all app data from JSON file"""
-        default_data = {
-            'user': None,
-            'current_mode': 'selection',
-            'tasks': [],
-            'notes': [],
-            'reminders': [],
-            'daily_goal': '',
-            'daily_goal_completed': False,
-            'sentiment_entries': [],
-            'food_entries': [],
-            'focus_points': 0,
-            'focus_history': [],
-            'comfort_vault': [],
-            'character_state': 'idle'
-        }
-        
-        if os.path.exists(self.data_file):
+        """Load all app data through the configured storage engine"""
+        self.store = open_store(self.data_file)
+        self.data = self.store.data
+        # Jake's state comes from the tracker, not the data file
+        self.character_state = 'idle'
+        
+        # Pick up writes made through the API without re-reading the file
+        self.store.subscribe(self.on_data_changed)
+        self.store.watch()
+    
+    def on_data_changed(self, seq, mutations):
+        """Store listener; may run on the watcher thread, so hop to Tk"""
+        self.root.after(0, self.update_points_display)
+    
+    def update_points_display(self):
+        """Refresh the header points label if it is on screen"""
+        if hasattr(self, 'points_label') and self.current_mode == 'work':
+            points = self.data.get('focus_points', 0)
+            points_color = "#2ecc71" if points >= 0 else "#e74c3c"
             try:
-                with open(self.data_file, 'r') as f:
-                    self.data = json.load(f)
-                # Merge with defaults to add any new fields
-                for key, value in default_data.items():
-                    if key not in self.data:
-                        self.data[key] = value
-            except:
-                self.data = default_data
-        else:
-            self.data = default_data
+                self.points_label.config(text=str(points), fg=points_color)
+            except tk.TclError:
+                pass  # Label was destroyed by a screen change
     
-    def save_data(self):
-        """Save all app data to JSON file"""
+    def save_data(self, mutations=None):
+        """Persist changes; without mutations the whole document is saved"""
         try:
-            with open(self.data_file, 'w') as f:
-                json.dump(self.data, f, indent=2)
+            if mutations is None:
+                self.store.replace(export_document(self.data))
+            else:
+                self.store.commit(mutations)
         except Exception as e:
             print(f"Error saving data: {e}")
     
@@ -153,8 +151,7 @@ class ProductivityWellnessApp:
     def set_mode(self, mode):
         """Set the app mode (work/chill) and show main interface"""
         self.current_mode = mode
-        self.data['current_mode'] = mode
-        self.save_data()
+        self.save_data([set_op('current_mode', mode)])
         self.show_main_app()
     
     def show_main_app(self):
@@ -680,13 +677,12 @@ class ProductivityWellnessApp:
             text = entry.get().strip()
             if text:
                 if "Task" in card_title:
-                    self.data['tasks'].append({'id': len(self.data['tasks']), 'text': text, 'completed': False})
+                    self.save_data([add_op('tasks', {'id': len(self.data['tasks']), 'text': text, 'completed': False})])
                 elif "Reminder" in card_title:
-                    self.data['reminders'].append({'text': text, 'time': None})
+                    self.save_data([add_op('reminders', {'text': text, 'time': None})])
                 elif "Note" in card_title:
-                    self.data['notes'].append({'title': text, 'content': '', 'date': datetime.now().isoformat()})
+                    self.save_data([add_op('notes', {'title': text, 'content': '', 'date': datetime.now().isoformat()})])
                 
-                self.save_data()
                 dialog.destroy()
                 self.show_main_app()  # Refresh
         
@@ -696,19 +692,16 @@ class ProductivityWellnessApp:
         """Toggle task completion"""
         for task in self.data['tasks']:
             if task['id'] == task_id:
-                task['completed'] = not task.get('completed', False)
+                self.save_data([update_op('tasks', task_id, {'completed': not task.get('completed', False)})])
                 break
-        self.save_data()
     
     def toggle_daily_goal(self, completed):
         """Toggle daily goal completion"""
-        self.data['daily_goal_completed'] = completed
-        self.save_data()
+        self.save_data([set_op('daily_goal_completed', completed)])
     
     def save_daily_goal(self, goal_text):
         """Save daily goal text"""
-        self.data['daily_goal'] = goal_text
-        self.save_data()
+        self.save_data([set_op('daily_goal', goal_text)])
     
     def upload_audio(self):
         """Upload audio file to comfort vault"""
@@ -727,13 +720,13 @@ class ProductivityWellnessApp:
     def submit_sentiment(self):
         """Submit sentiment analysis"""
         entry = {
+            'id': str(datetime.now().timestamp()),
             'date': datetime.now().isoformat(),
             'mood': 'neutral',  # Would be selected from UI
             'color': None,
             'answers': []
         }
-        self.data['sentiment_entries'].append(entry)
-        self.save_data()
+        self.save_data([add_op('sentiment_entries', entry)])
         messagebox.showinfo("Saved", "Sentiment logged!")
     
     def toggle_grayscale(self):
@@ -746,8 +739,7 @@ class ProductivityWellnessApp:
     def exit_to_selection(self):
         """Return to mode selection screen"""
         self.current_mode = 'selection'
-        self.data['current_mode'] = 'selection'
-        self.save_data()
+        self.save_data([set_op('current_mode', 'selection')])
         self.show_mode_selection()
     
     def refresh_motivation(self, parent, theme):
@@ -793,27 +785,11 @@ class ProductivityWellnessApp:
             messagebox.showerror("Error", f"Could not launch Jake: {e}")
     
     def start_focus_tracker(self):
-        """Start the focus tracking thread"""
-        def track():
-            while True:
-                try:
-                    # Read character state if exists
-                    if os.path.exists("character_state.txt"):
-                        with open("character_state.txt", "r") as f:
-                            state = f.read().strip()
-                            self.data['character_state'] = state
-                    
-                    # Update points display if in work mode
-                    if hasattr(self, 'points_label') and self.current_mode == 'work':
-                        points = self.data.get('focus_points', 0)
-                        points_color = "#2ecc71" if points >= 0 else "#e74c3c"
-                        self.points_label.config(text=str(points), fg=points_color)
-                    
-                    time.sleep(2)
-                except:
-                    pass
-        
-        threading.Thread(target=track, daemon=True).start()
+        """Follow character state changes from the tracker's local state slot"""
+        def on_state(state):
+            self.character_state = state
+        
+        threading.Thread(target=follow_state, args=(on_state,), daemon=True).start()
 
 if __name__ == "__main__":
     app = ProductivityWellnessApp()
\ No newline at end of file
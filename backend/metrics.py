@@ -0,0 +1,201 @@
+"""
+Request and storage metrics for the Touchgrass API
+Fixed-bucket histograms and plain counters, cheap enough to leave on in
+production, exported as Prometheus text or JSON by GET /api/metrics
+"""
+
+import bisect
+import time
+from contextlib import contextmanager
+
+# Upper bounds (Prometheus "le") of the latency buckets, in seconds
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+# ...and of the payload size buckets, in bytes
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+
+HELP = {
+    "http_request_duration_seconds": ("histogram", "Time spent handling a request, by route"),
+    "http_response_size_bytes": ("histogram", "Response body size (after compression), by route"),
+    "http_request_size_bytes": ("histogram", "Request body size, by route"),
+    "http_requests_total": ("counter", "Requests handled, by route and status"),
+    "http_errors_total": ("counter", "Requests that ended in a 5xx, by route"),
+    "store_operation_seconds": ("histogram", "Storage engine time, by operation (load/append/refresh/compact)"),
+}
+
+
+class Histogram:
+    """
+    Counts per fixed bucket plus a running sum.
+
+    ``observe()`` takes no lock: under the GIL a concurrent update can very
+    rarely lose one count, which is fine for monitoring and keeps the hot
+    path to a bisect and two adds.
+    """
+
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    def cumulative(self):
+        """[(le, count of observations <= le)], ending with +Inf"""
+        total = 0
+        result = []
+        for bound, count in zip(list(self.bounds) + ["+Inf"], list(self.counts)):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (None if empty)"""
+        buckets = self.cumulative()
+        count = buckets[-1][1]
+        if not count:
+            return None
+        for bound, total in buckets:
+            if total >= q * count:
+                return bound
+
+
+class Metrics:
+    """Histograms and counters keyed by (name, labels)"""
+
+    def __init__(self, prefix="touchgrass"):
+        self.prefix = prefix
+        self.started = time.time()
+        self.histograms = {}
+        self.counters = {}
+
+    def histogram(self, name, labels=(), bounds=LATENCY_BUCKETS):
+        key = (name, labels)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            # setdefault is atomic, so two threads never end up with two histograms
+            histogram = self.histograms.setdefault(key, Histogram(bounds))
+        return histogram
+
+    def inc(self, name, labels=(), by=1):
+        key = (name, labels)
+        self.counters[key] = self.counters.get(key, 0) + by
+
+    @contextmanager
+    def timer(self, name, labels=()):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name, labels).observe(time.perf_counter() - start)
+
+    # ---------- export ----------
+
+    def prometheus(self):
+        """Prometheus text exposition format"""
+        lines = []
+        families = {}
+        for (name, labels), histogram in sorted(self.histograms.items(), key=lambda kv: kv[0]):
+            families.setdefault(name, []).append((labels, histogram))
+        for (name, labels), value in sorted(self.counters.items(), key=lambda kv: kv[0]):
+            families.setdefault(name, []).append((labels, value))
+
+        for name, series in families.items():
+            kind, text = HELP.get(name, ("untyped", name))
+            full = f"{self.prefix}_{name}"
+            lines.append(f"# HELP {full} {text}")
+            lines.append(f"# TYPE {full} {kind}")
+            for labels, value in series:
+                if isinstance(value, Histogram):
+                    for bound, total in value.cumulative():
+                        lines.append(f"{full}_bucket{_labels(labels + (('le', bound),))} {total}")
+                    lines.append(f"{full}_sum{_labels(labels)} {value.sum}")
+                    lines.append(f"{full}_count{_labels(labels)} {sum(value.counts)}")
+                else:
+                    lines.append(f"{full}{_labels(labels)} {value}")
+
+        lines.append(f"# TYPE {self.prefix}_uptime_seconds gauge")
+        lines.append(f"{self.prefix}_uptime_seconds {time.time() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def json(self):
+        """The same numbers as nested dicts, with approximate p50/p95/p99"""
+        result = {"uptime_seconds": round(time.time() - self.started, 3)}
+        for (name, labels), histogram in list(self.histograms.items()):
+            result.setdefault(name, []).append({
+                "labels": dict(labels),
+                "count": sum(histogram.counts),
+                "sum": histogram.sum,
+                "p50": histogram.quantile(0.5),
+                "p95": histogram.quantile(0.95),
+                "p99": histogram.quantile(0.99),
+                "buckets": {str(bound): total for bound, total in histogram.cumulative()},
+            })
+        for (name, labels), value in list(self.counters.items()):
+            result.setdefault(name, []).append({"labels": dict(labels), "value": value})
+        return result
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# ============= INSTRUMENTATION =============
+
+def instrument_app(app, metrics):
+    """Record latency, sizes, status and errors of every Flask request"""
+    from flask import g, request
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        labels = (("route", route), ("method", request.method))
+        metrics.histogram("http_request_duration_seconds", labels).observe(time.perf_counter() - start)
+        if request.content_length:
+            metrics.histogram("http_request_size_bytes", labels, SIZE_BUCKETS).observe(request.content_length)
+        if not response.is_streamed:
+            metrics.histogram("http_response_size_bytes", labels, SIZE_BUCKETS).observe(
+                response.calculate_content_length() or 0)
+        metrics.inc("http_requests_total", labels + (("status", response.status_code),))
+        if response.status_code >= 500:
+            metrics.inc("http_errors_total", (("route", route),))
+        return response
+
+    return app
+
+
+def instrument_store(store, metrics):
+    """Time the storage engine calls behind a DataStore"""
+    engine = store.engine
+    for op, method in (("load", "load"), ("append", "append"),
+                       ("refresh", "changes_since"), ("compact", "compact")):
+        setattr(engine, method, _timed(getattr(engine, method), metrics, op))
+    return store
+
+
+def _timed(fn, metrics, op):
+    histogram = metrics.histogram("store_operation_seconds", (("op", op),))
+
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    return wrapper
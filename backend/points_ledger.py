@@ -0,0 +1,157 @@
+"""
+Focus points ledger for Touchgrass
+Every points change is appended to focus_history as one small entry
+({"date", "points", "source"}) next to the focus_points running total, and
+PointsLedger keeps per-hour/day/source rollups of it in memory so "points
+today" and the Focus Tracker chart never rescan the history
+
+The focus tracker's entries are activity intervals: the same entry plus
+"end", "app", "category" and "title_id" (see focus_titles), one per stretch
+of time in one window, carrying the points earned in it.
+"""
+
+import hashlib
+from datetime import datetime, timedelta
+
+from data_store import add_op, incr_op
+
+LEDGER_KEY = "focus_history"
+
+# Bucket sizes the chart can ask for: (key length of an entry date, step)
+BUCKETS = {
+    "hour": (13, timedelta(hours=1)),  # 2026-10-18T09
+    "day": (10, timedelta(days=1)),    # 2026-10-18
+}
+
+
+def points_ops(change, source, at=None, **fields):
+    """Mutations for one points change: a ledger entry (plus any extra fields) and the running total"""
+    entry = {
+        "date": (at or datetime.now()).isoformat(timespec='seconds'),
+        "points": change,
+        "source": source
+    }
+    entry.update(fields)
+    return [add_op(LEDGER_KEY, entry), incr_op('focus_points', change)]
+
+
+def title_id(title):
+    """Short stable id for a window title, so intervals don't repeat the text"""
+    return hashlib.sha1(title.encode('utf-8')).hexdigest()[:12]
+
+
+def activity(history, day):
+    """
+    Seconds per app and per category on ``day`` (YYYY-MM-DD) from the
+    tracker's intervals. History is in append order, so the scan walks back
+    from the newest entry and stops at the first one from an earlier day.
+    """
+    by_app, by_category = {}, {}
+    for entry in reversed(history):
+        date = entry.get("date") or ""
+        if date[:10] < day:
+            break
+        if date[:10] > day or "end" not in entry:
+            continue
+        seconds = (datetime.fromisoformat(entry["end"]) - datetime.fromisoformat(date)).total_seconds()
+        app, category = entry.get("app") or "unknown", entry.get("category") or "idle"
+        by_app[app] = by_app.get(app, 0) + seconds
+        by_category[category] = by_category.get(category, 0) + seconds
+    return {"date": day, "by_app": by_app, "by_category": by_category}
+
+
+class PointsLedger:
+    """
+    Rollups of the points ledger, kept in sync with a DataStore through its
+    change notifications.
+
+    New ledger entries are folded in as they are committed (O(1) each).
+    Anything else that touches focus_history (a removal, a whole-document
+    replace, a reload) marks the rollups stale and they are rebuilt from
+    the ledger on the next read.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._stale = True
+        self.by_hour = {}
+        self.by_day = {}
+        self.by_source = {}
+        self.entries = 0
+        store.subscribe(self._on_change)
+
+    def _on_change(self, seq, mutations):
+        if self._stale:
+            return
+        if mutations is None:
+            self._stale = True
+            return
+        for mutation in mutations:
+            if mutation["op"] == "replace":
+                self._stale = True
+            elif mutation.get("key") != LEDGER_KEY:
+                continue
+            elif mutation["op"] == "add":
+                self._fold(mutation["item"])
+            else:
+                self._stale = True
+            if self._stale:
+                return
+
+    def _fold(self, entry):
+        if not isinstance(entry, dict) or not isinstance(entry.get("points"), (int, float)):
+            return
+        points = entry["points"]
+        date = entry.get("date") or ""
+        hour, day = date[:13], date[:10]
+        source = entry.get("source") or "unknown"
+        self.by_hour[hour] = self.by_hour.get(hour, 0) + points
+        self.by_day[day] = self.by_day.get(day, 0) + points
+        self.by_source[source] = self.by_source.get(source, 0) + points
+        self.entries += 1
+
+    def _rollups(self):
+        if self._stale:
+            self.by_hour, self.by_day, self.by_source = {}, {}, {}
+            self.entries = 0
+            for entry in self.store.data.get(LEDGER_KEY, []):
+                self._fold(entry)
+            self._stale = False
+        return self
+
+    # ---------- reads (call inside store.view()) ----------
+
+    def today(self, now=None):
+        """Points earned since midnight"""
+        day = (now or datetime.now()).strftime("%Y-%m-%d")
+        return self._rollups().by_day.get(day, 0)
+
+    def summary(self, now=None):
+        """Balance, today's points and the all-time split per source"""
+        self._rollups()
+        return {
+            "focus_points": self.store.data.get("focus_points", 0),
+            "today": self.today(now),
+            "by_source": dict(self.by_source),
+            "entries": self.entries
+        }
+
+    def series(self, bucket="hour", count=24, now=None):
+        """The last ``count`` hours or days as [{"start", "points"}], oldest first"""
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket: {bucket}")
+        key_len, step = BUCKETS[bucket]
+        totals = self._rollups().by_hour if bucket == "hour" else self.by_day
+
+        start = now or datetime.now()
+        if bucket == "hour":
+            start = start.replace(minute=0, second=0, microsecond=0)
+        else:
+            start = start.replace(hour=0, minute=0, second=0, microsecond=0)
+        start -= step * (count - 1)
+
+        series = []
+        for i in range(count):
+            key = (start + step * i).isoformat()[:key_len]
+            series.append({"start": key, "points": totals.get(key, 0)})
+        return series
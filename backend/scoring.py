@@ -0,0 +1,71 @@
+"""
+Time-weighted focus scoring
+Points come from time spent per category, not from how often the tracker
+looks: a category's weight (focus_rules.json) is the points earned per
+``per_seconds`` seconds in it, integrated over the exact time between two
+calls. Checking every second or every minute gives the same score.
+
+Settings (the "scoring" section of focus_rules.json, all optional):
+    per_seconds               seconds a category's weight is earned over (5)
+    half_life_minutes         decay of the mood score toward 0, 0 for none (0)
+    comfort_threshold         mood score at or below which comfort audio plays (-5)
+    negative_reward_threshold mood score at or below which the tracker warns (-10)
+
+``earned`` is the undecayed total the ledger is credited with; ``score`` is
+the (optionally decaying) mood score the thresholds are checked against.
+"""
+
+import math
+
+DEFAULT_SCORING = {
+    "per_seconds": 5,
+    "half_life_minutes": 0,
+    "comfort_threshold": -5,
+    "negative_reward_threshold": -10,
+}
+
+
+class ScoringEngine:
+    def __init__(self, settings=None, start=0.0):
+        self.settings = dict(DEFAULT_SCORING)
+        self.configure(settings)
+        self.at = start
+        self.score = 0.0
+        self.earned = 0.0
+        self.seconds = {}
+        self._paid = 0
+
+    def configure(self, settings):
+        """Apply new settings (e.g. after the rules file was reloaded)"""
+        self.settings = dict(DEFAULT_SCORING, **(settings or {}))
+
+    def advance(self, now, weight, category=None):
+        """Credit the time since the last call to the category that was active during it"""
+        elapsed = now - self.at
+        self.at = now
+        if elapsed <= 0:
+            return
+        rate = weight / self.settings["per_seconds"]
+        self.earned += rate * elapsed
+
+        half_life = self.settings["half_life_minutes"] * 60
+        if half_life > 0:
+            # Exact solution of d(score)/dt = rate - k * score over the interval
+            k = math.log(2) / half_life
+            kept = math.exp(-k * elapsed)
+            self.score = self.score * kept + rate / k * (1 - kept)
+        else:
+            self.score += rate * elapsed
+
+        if category:
+            self.seconds[category] = self.seconds.get(category, 0) + elapsed
+
+    def take_points(self):
+        """Whole points earned since the last call; the fraction carries over"""
+        whole = int(self.earned) - self._paid
+        self._paid += whole
+        return whole
+
+    def below(self, threshold):
+        """True when the mood score is at or below a threshold setting"""
+        return self.score <= self.settings[threshold]
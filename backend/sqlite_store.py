@@ -0,0 +1,223 @@
+"""
+SQLite storage engine for Touchgrass
+Keeps every collection in its own indexed table so adding, toggling or
+deleting one entry is a single keyed statement instead of a file rewrite
+
+Select it with TOUCHGRASS_STORAGE=sqlite. Migrate an existing data file with:
+    python sqlite_store.py ../app_data.json ../app_data.db
+"""
+
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import contextmanager
+
+from data_store import (DEFAULT_DATA, NEWEST_FIRST, JsonJournalEngine, entry_date, export_document,
+                        import_document, with_defaults)
+
+# Every list in the default document gets its own table
+COLLECTIONS = [key for key, value in DEFAULT_DATA.items() if isinstance(value, list)]
+
+# Meta key holding the sequence number of the last committed record
+SEQ_META = "_seq"
+
+# Committed records kept in the changes table for other processes to replay
+CHANGES_KEPT = 1000
+
+
+def default_db_path(json_path):
+    """app_data.json -> app_data.db next to it, unless TOUCHGRASS_DB_FILE is set"""
+    return os.environ.get("TOUCHGRASS_DB_FILE", os.path.splitext(json_path)[0] + ".db")
+
+
+class SqliteEngine:
+    """
+    Storage engine backed by one SQLite database.
+
+    Scalar fields live in a ``meta`` key/value table. Each collection is a
+    table ordered by ``pos`` (document order, so newest first for
+    NEWEST_FIRST collections) with an index on ``id`` (for toggles and
+    deletes) and on ``date`` (for date range reads). Every commit runs in a
+    single SQLite transaction, so there is nothing to compact. Other
+    processes are detected through the sequence number in ``meta`` and
+    catch up by replaying the recent records kept in ``changes`` (a full
+    reload only if they fell further behind than that).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self._create_tables()
+
+    def _create_tables(self):
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY, ops TEXT NOT NULL)")
+        for name in COLLECTIONS:
+            # `id` has no declared type so task ids stay integers and entry ids stay strings
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS {name} "
+                              f"(pos INTEGER PRIMARY KEY, id, date TEXT, body TEXT NOT NULL)")
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name}_id ON {name} (id)")
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {name}_date ON {name} (date)")
+
+    def load(self):
+        """Read the whole document back out of the tables"""
+        data = {}
+        seq = 0
+        for key, value in self.conn.execute("SELECT key, value FROM meta"):
+            if key == SEQ_META:
+                seq = int(value)
+            else:
+                data[key] = json.loads(value)
+        for name in COLLECTIONS:
+            rows = self.conn.execute(f"SELECT body FROM {name} ORDER BY pos")
+            data[name] = [json.loads(body) for (body,) in rows]
+        return with_defaults(import_document(data)), seq
+
+    def _stored_seq(self):
+        row = self.conn.execute("SELECT value FROM meta WHERE key = ?", (SEQ_META,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def changes_since(self, seq):
+        """Records other processes committed after ``seq``, or None if they are no longer kept"""
+        if self._stored_seq() == seq:
+            return []
+        rows = self.conn.execute("SELECT seq, ops FROM changes WHERE seq > ? ORDER BY seq", (seq,)).fetchall()
+        if not rows or rows[0][0] != seq + 1:
+            return None
+        return [{"seq": record_seq, "ops": json.loads(ops)} for record_seq, ops in rows]
+
+    # ---------- writes ----------
+
+    @contextmanager
+    def locked(self):
+        """Re-entrant write transaction; BEGIN IMMEDIATE locks out other processes"""
+        with self._thread_lock:
+            self._depth += 1
+            outermost = self._depth == 1
+            if outermost:
+                self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self
+            except BaseException:
+                if outermost:
+                    self.conn.execute("ROLLBACK")
+                raise
+            else:
+                if outermost:
+                    self.conn.execute("COMMIT")
+            finally:
+                self._depth -= 1
+
+    def append(self, seq, mutations, data):
+        """Translate one committed record into keyed SQL statements (inside locked())"""
+        # A set on a collection (or a replace) writes it from the final
+        # in-memory data, which already holds the rest of the record's ops
+        rewritten = set()
+        for mutation in mutations:
+            if mutation.get("key") in rewritten or "*" in rewritten:
+                continue
+            self._apply(mutation, data)
+            if mutation["op"] == "replace":
+                rewritten.add("*")
+            elif mutation["op"] in ("set", "incr") and mutation["key"] in COLLECTIONS:
+                rewritten.add(mutation["key"])
+        self._set_meta(SEQ_META, seq)
+        self.conn.execute("INSERT OR REPLACE INTO changes (seq, ops) VALUES (?, ?)",
+                          (seq, json.dumps(mutations, separators=(',', ':'))))
+        self.conn.execute("DELETE FROM changes WHERE seq <= ?", (seq - CHANGES_KEPT,))
+
+    def _apply(self, mutation, data):
+        op = mutation["op"]
+        key = mutation.get("key")
+        if op in ("set", "incr"):
+            # The in-memory document already holds the new value
+            if key in COLLECTIONS:
+                self._write_collection(key, export_document(data)[key])
+            else:
+                self._set_meta(key, data[key])
+        elif op == "add":
+            item = mutation["item"]
+            self._ensure_collection(key)
+            if key in NEWEST_FIRST:
+                pos = "(SELECT IFNULL(MIN(pos), 0) - 1 FROM {0})"
+            else:
+                pos = "(SELECT IFNULL(MAX(pos), 0) + 1 FROM {0})"
+            self.conn.execute(f"INSERT INTO {key} (pos, id, date, body) VALUES ({pos.format(key)}, ?, ?, ?)",
+                              (item.get('id'), entry_date(item), json.dumps(item)))
+        elif op == "update":
+            row = self.conn.execute(f"SELECT pos, body FROM {key} WHERE id = ? LIMIT 1",
+                                    (mutation["id"],)).fetchone()
+            if row:
+                item = json.loads(row[1])
+                item.update(mutation["fields"])
+                self.conn.execute(f"UPDATE {key} SET date = ?, body = ? WHERE pos = ?",
+                                  (entry_date(item), json.dumps(item), row[0]))
+        elif op == "remove":
+            self.conn.execute(f"DELETE FROM {key} WHERE id = ?", (mutation["id"],))
+        elif op == "prune":
+            self.conn.executemany(f"DELETE FROM {key} WHERE id = ?", ((item_id,) for item_id in mutation["ids"]))
+        elif op == "replace":
+            self.write_all(data)
+        else:
+            raise ValueError(f"Unknown mutation: {op}")
+
+    def _ensure_collection(self, key):
+        if key not in COLLECTIONS:
+            raise ValueError(f"Unknown collection: {key}")
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def _write_collection(self, name, items):
+        self.conn.execute(f"DELETE FROM {name}")
+        self.conn.executemany(
+            f"INSERT INTO {name} (pos, id, date, body) VALUES (?, ?, ?, ?)",
+            ((pos, item.get('id') if isinstance(item, dict) else None, entry_date(item), json.dumps(item))
+             for pos, item in enumerate(items)))
+
+    def write_all(self, data):
+        """Rewrite every table from a whole document"""
+        self.conn.execute("DELETE FROM meta WHERE key != ?", (SEQ_META,))
+        for key, value in export_document(data).items():
+            if key in COLLECTIONS:
+                self._write_collection(key, value)
+            else:
+                self._set_meta(key, value)
+
+    def wants_compaction(self):
+        return False
+
+    def compact(self, store):
+        pass
+
+    def close(self):
+        self.conn.close()
+
+
+def migrate_json(json_path, db_path):
+    """One-shot copy of app_data.json (plus any journal) into a SQLite database"""
+    source = JsonJournalEngine(json_path)
+    data, seq = source.load()
+    source.close()
+
+    engine = SqliteEngine(db_path)
+    with engine.locked():
+        engine.write_all(data)
+        engine._set_meta(SEQ_META, seq)
+    engine.close()
+
+    counts = ", ".join(f"{len(data[name])} {name}" for name in COLLECTIONS)
+    print(f"✓ Migrated {json_path} -> {db_path} ({counts})")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python sqlite_store.py <app_data.json> <app_data.db>")
+        sys.exit(1)
+    migrate_json(sys.argv[1], sys.argv[2])
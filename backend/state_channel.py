@@ -0,0 +1,119 @@
+"""
+Local character state channel
+The focus tracker writes Jake's state into a small memory-mapped slot
+(character_state.slot next to character_state.txt) guarded by a sequence
+counter, seqlock style: the counter is odd while a write is in progress
+and goes up by two per state. Readers in any process on this machine map
+the same file and read it without locks or system calls, retrying if the
+counter moved under them, so following the state is a memory read.
+
+If the writer died halfway through a write, the counter stays odd. Readers
+give up after a few retries and fall back to the last state they read, or
+to character_state.txt, until the tracker publishes again.
+
+Only the tracker writes; everything else reads or follows:
+    slot = StateSlot()
+    version, state = slot.read()
+    follow_state(lambda state: print(state))
+"""
+
+import mmap
+import os
+import struct
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_SLOT_FILE = os.environ.get("TOUCHGRASS_STATE_SLOT", os.path.join(BASE_DIR, "..", "character_state.slot"))
+
+# [sequence: u64][length: u8][state: up to 55 utf-8 bytes]
+SLOT_SIZE = 64
+SEQ = struct.Struct("<Q")
+LENGTH_AT = SEQ.size
+DATA_AT = LENGTH_AT + 1
+MAX_STATE = SLOT_SIZE - DATA_AT
+# Reads retried while a write is in progress before falling back
+READ_RETRIES = 1000
+
+
+class StateSlot:
+    def __init__(self, path=STATE_SLOT_FILE):
+        self.path = path
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+        try:
+            if os.fstat(fd).st_size < SLOT_SIZE:
+                os.ftruncate(fd, SLOT_SIZE)
+            self._mm = mmap.mmap(fd, SLOT_SIZE)
+        finally:
+            os.close(fd)
+        self._last = None
+        # An odd counter at open is a write that never finished
+        seq = SEQ.unpack_from(self._mm)[0]
+        self._torn = seq if seq & 1 else None
+
+    def publish(self, state):
+        """Write a new state (single writer: the focus tracker)"""
+        data = state.encode("utf-8")[:MAX_STATE]
+        seq = SEQ.unpack_from(self._mm)[0] | 1
+        SEQ.pack_into(self._mm, 0, seq)  # odd: readers retry
+        self._mm[LENGTH_AT] = len(data)
+        self._mm[DATA_AT:DATA_AT + len(data)] = data
+        SEQ.pack_into(self._mm, 0, seq + 1)  # the last write makes it readable
+        return (seq + 1) // 2
+
+    def read(self):
+        """(version, state); version 0 and "idle" if nothing was ever published"""
+        for _ in range(READ_RETRIES):
+            seq = SEQ.unpack_from(self._mm)[0]
+            if seq == self._torn:
+                break
+            if seq & 1:
+                time.sleep(0)
+                continue
+            data = self._mm[DATA_AT:DATA_AT + self._mm[LENGTH_AT]]
+            if SEQ.unpack_from(self._mm)[0] == seq:
+                self._last = seq // 2, (data.decode("utf-8", "replace") if seq else "idle")
+                return self._last
+        else:
+            # Still odd: the writer stopped mid-write, don't spin on it again
+            self._torn = seq
+        return seq // 2, self._fallback()
+
+    def _fallback(self):
+        if self._last:
+            return self._last[1]
+        try:
+            with open(os.path.splitext(self.path)[0] + ".txt", 'r') as f:
+                return f.read().strip() or "idle"
+        except OSError:
+            return "idle"
+
+    def wait(self, since, timeout, poll_interval=0.05):
+        """(version, state) once the version differs from ``since``, or None after ``timeout`` seconds"""
+        deadline = time.monotonic() + timeout
+        while True:
+            version, state = self.read()
+            if version != since:
+                return version, state
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
+
+    def close(self):
+        self._mm.close()
+
+
+def follow_state(on_state, path=STATE_SLOT_FILE, stop=None, poll_interval=0.1):
+    """
+    Call ``on_state(state)`` with the current state and then on every
+    change. Blocks; run it on a daemon thread. Returns once ``stop`` is set.
+    """
+    slot = StateSlot(path)
+    version = None
+    try:
+        while not (stop and stop.is_set()):
+            changed = slot.wait(version, 1.0, poll_interval)
+            if changed:
+                version, state = changed
+                on_state(state)
+    finally:
+        slot.close()
@@ -1,27 +1,198 @@
+import atexit
 import os
-import pygame
+import queue
 import random
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 
-pygame.mixer.init()
+try:
+    import pygame
+except ImportError:
+    pygame = None
 
-# Play a random comfort audio
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+AUDIO_DIR = os.environ.get("TOUCHGRASS_AUDIO_DIR", "../audio_library")
+# "pygame", or "null" to play nothing (servers, benchmarks, no sound card)
+AUDIO_BACKEND = os.environ.get("TOUCHGRASS_AUDIO", "pygame")
+
+# Plays nothing; used headless and whenever pygame can't start
+class NullAudio:
+    name = "null"
+
+    def load(self, path):
+        return path
+
+    def size(self, clip):
+        return 0
+
+    def play(self, clip):
+        pass
+
+# pygame's mixer, started when the first clip is needed. Clips are decoded
+# into memory once (mixer.Sound) and share one channel, so a new clip
+# replaces the one playing, as mixer.music did.
+class PygameAudio:
+    name = "pygame"
+
+    def __init__(self):
+        if pygame is None:
+            raise RuntimeError("pygame is not installed")
+        pygame.mixer.init()
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        self.bytes_per_second = frequency * channels * abs(sample_format) // 8
+        self.channel = pygame.mixer.Channel(0)
+
+    def load(self, path):
+        return pygame.mixer.Sound(path)
+
+    def size(self, clip):
+        return int(clip.get_length() * self.bytes_per_second)
+
+    def play(self, clip):
+        self.channel.play(clip)
+
+# Index of the audio library (comfort.mp3 and voice_notes/*.mp3) and an LRU
+# of decoded clips holding at most max_bytes. The voice notes are only
+# listed again after the folder changes: watchdog reports changes when it
+# is installed, otherwise the folder's mtime is checked (a stat, not a
+# listdir). A clip is decoded again if its file changed.
+class AudioLibrary:
+    def __init__(self, root=AUDIO_DIR, backend=AUDIO_BACKEND, max_bytes=32 * 1024 * 1024):
+        self.root = root
+        self.voice_folder = os.path.join(root, "voice_notes")
+        self.backend_name = backend
+        self.max_bytes = max_bytes
+        self.clips = OrderedDict()  # path -> (mtime, clip, size)
+        self.cached_bytes = 0
+        self._backend = None
+        self._voice_notes = []
+        self._voice_mtime = None
+        self._stale = True
+        self._observer = None
+        self._lock = threading.RLock()
+
+    def backend(self):
+        with self._lock:
+            if self._backend is None:
+                self._backend = NullAudio()
+                if self.backend_name == "pygame":
+                    try:
+                        self._backend = PygameAudio()
+                    except Exception as e:
+                        print(f"Error starting audio, continuing without sound: {e}")
+            return self._backend
+
+    def voice_notes(self):
+        with self._lock:
+            if self._stale or (not self._observer and self._folder_mtime() != self._voice_mtime):
+                self._index()
+            return self._voice_notes
+
+    def clip(self, path):
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self.clips.get(path)
+            if cached and cached[0] == mtime:
+                self.clips.move_to_end(path)
+                return cached[1]
+            backend = self.backend()
+            clip = backend.load(path)
+            size = backend.size(clip)
+            self._forget(path)
+            if size <= self.max_bytes:
+                self.clips[path] = (mtime, clip, size)
+                self.cached_bytes += size
+                while self.cached_bytes > self.max_bytes:
+                    self._forget(next(iter(self.clips)))
+            return clip
+
+    def play(self, path):
+        try:
+            clip = self.clip(path)
+        except OSError:
+            return False
+        except Exception as e:
+            print(f"Error loading {path}: {e}")
+            return False
+        self.backend().play(clip)
+        return True
+
+    def preload(self):
+        try:
+            self.clip(os.path.join(self.root, "comfort.mp3"))
+        except Exception:
+            pass
+        for file in self.voice_notes():
+            if self.cached_bytes >= self.max_bytes:
+                break
+            try:
+                self.clip(os.path.join(self.voice_folder, file))
+            except Exception:
+                pass
+
+    def _forget(self, path):
+        cached = self.clips.pop(path, None)
+        if cached:
+            self.cached_bytes -= cached[2]
+
+    def _folder_mtime(self):
+        try:
+            return os.stat(self.voice_folder).st_mtime_ns
+        except OSError:
+            return None
+
+    def _index(self):
+        # Clear the flag first so a change during the listdir is not lost
+        self._stale = False
+        self._voice_mtime = self._folder_mtime()
+        if Observer and not self._observer and self._voice_mtime is not None:
+            self._watch()
+        try:
+            self._voice_notes = sorted(f for f in os.listdir(self.voice_folder) if f.endswith(".mp3"))
+        except OSError:
+            self._voice_notes = []
+
+    def _watch(self):
+        library = self
+
+        class Changed(FileSystemEventHandler):
+            def on_any_event(self, event):
+                library._stale = True
+
+        try:
+            observer = Observer()
+            observer.daemon = True
+            observer.schedule(Changed(), self.voice_folder)
+            observer.start()
+            self._observer = observer
+        except Exception as e:
+            print(f"Error watching {self.voice_folder}, checking it on use instead: {e}")
+
+audio = AudioLibrary()
+
+# Play the comfort audio
 def play_comfort_audio():
-    if not os.path.exists("../audio_library/comfort.mp3"):
-        return
-    pygame.mixer.music.load("../audio_library/comfort.mp3")
-    pygame.mixer.music.play()
-    print("🎵 Playing comfort audio")
+    if audio.play(os.path.join(audio.root, "comfort.mp3")):
+        print("🎵 Playing comfort audio")
 
 # Play a random voice note
 def play_voice_note():
-    folder = "../audio_library/voice_notes"
-    files = [f for f in os.listdir(folder) if f.endswith(".mp3")]
+    files = audio.voice_notes()
     if files:
         file = random.choice(files)
-        pygame.mixer.music.load(os.path.join(folder, file))
-        pygame.mixer.music.play()
-        print(f"🎤 Playing voice note: {file}")
+        if audio.play(os.path.join(audio.voice_folder, file)):
+            print(f"🎤 Playing voice note: {file}")
+
+# Index and decode the audio library in the background so the first clip plays right away
+def preload_audio():
+    threading.Thread(target=audio.preload, daemon=True).start()
 
 # Return today's folder path
 def get_daily_folder():
@@ -31,9 +202,93 @@ def get_daily_folder():
         os.makedirs(folder)
     return folder
 
-# Save a note/task to today's folder
+# Buffers notes in memory and appends them from one background thread.
+# Files stay open for the day and are swapped for the next day's at
+# midnight; buffered notes go out once they reach flush_bytes or are
+# flush_seconds old, and whatever is left is written on exit.
+class NoteWriter:
+    def __init__(self, root="../Daily_Notes", flush_bytes=64 * 1024, flush_seconds=15):
+        self.root = root
+        self.flush_bytes = flush_bytes
+        self.flush_seconds = flush_seconds
+        self.queue = queue.Queue()
+        self._files = {}
+        self._day = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    def write(self, note_text, filename="notes.txt"):
+        if not self._thread:
+            self._start()
+        # The day comes from when the note was made, not when it is written
+        self.queue.put((datetime.now().strftime("%Y-%m-%d"), filename, note_text + "\n"))
+
+    def flush(self, timeout=5):
+        if self._thread and self._thread.is_alive():
+            done = threading.Event()
+            self.queue.put(done)
+            done.wait(timeout)
+
+    def close(self):
+        self.flush()
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+    def _start(self):
+        with self._start_lock:
+            if not self._thread:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        pending, size, oldest = {}, 0, None
+        while True:
+            timeout = max(0, self.flush_seconds - (time.monotonic() - oldest)) if oldest else None
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, tuple):
+                day, filename, text = item
+                pending.setdefault((day, filename), []).append(text)
+                size += len(text)
+                oldest = oldest or time.monotonic()
+                if size < self.flush_bytes and time.monotonic() - oldest < self.flush_seconds:
+                    continue
+
+            if pending:
+                try:
+                    self._write(pending)
+                except Exception as e:
+                    print(f"Error saving notes: {e}")
+                pending, size, oldest = {}, 0, None
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def _write(self, pending):
+        for (day, filename), lines in pending.items():
+            self._open(day, filename).write(''.join(lines))
+        for f in self._files.values():
+            f.flush()
+
+    def _open(self, day, filename):
+        if day != self._day:
+            for f in self._files.values():
+                f.close()
+            self._files = {}
+            self._day = day
+        f = self._files.get(filename)
+        if f is None:
+            folder = os.path.join(self.root, day)
+            os.makedirs(folder, exist_ok=True)
+            f = self._files[filename] = open(os.path.join(folder, filename), "a")
+        return f
+
+notes = NoteWriter()
+
+# Save a note/task to today's folder (written in the background, see NoteWriter)
 def save_note(note_text, filename="notes.txt"):
-    folder = get_daily_folder()
-    path = os.path.join(folder, filename)
-    with open(path, "a") as f:
-        f.write(note_text + "\n")
+    notes.write(note_text, filename)
@@ -0,0 +1,175 @@
+"""
+Where the focus tracker gets the active window title from
+A window source reports the title only when it changes. ``wait(timeout)``
+blocks until the active window (or its title) changes and returns the new
+title, or returns None if nothing changed within ``timeout`` seconds.
+
+- WinEventWindowSource: Windows foreground/title-change hooks, no polling
+- PollingWindowSource:  reads the title on an adaptive interval: quick
+  right after a change, backing off while the window stays the same
+
+``open_window_source()`` picks the best one available. Recorded, replayed
+and synthetic sources are in window_trace.py. A source that runs out of
+input (the end of a replayed trace) raises SourceClosed from wait().
+"""
+
+import sys
+import threading
+import time
+
+from clock import SYSTEM_CLOCK
+
+try:
+    import pygetwindow as gw
+except ImportError:
+    gw = None
+
+
+class SourceClosed(Exception):
+    """The source has no more window changes to report"""
+
+
+def read_active_title():
+    """The active window's title, lowercased ("idle" when there is none)"""
+    win = gw.getActiveWindow() if gw else None
+    return win.title.lower() if win and win.title else "idle"
+
+
+class WindowSource:
+    """Base class: tracks the current title and counts how often it was read"""
+
+    def __init__(self, read_title=read_active_title):
+        self.read_title = read_title
+        self.title = read_title()
+        self.reads = 1
+
+    def _read(self):
+        self.reads += 1
+        return self.read_title()
+
+    def wait(self, timeout):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class PollingWindowSource(WindowSource):
+    """
+    Polls the title. The interval starts at ``min_interval`` after a change
+    and grows by ``backoff`` on every unchanged read up to ``max_interval``,
+    so a switch is seen within half a second while the user is moving
+    around, and a switch after a long stretch in one window is still seen
+    within ``max_interval`` seconds. A read is just the title lookup; the
+    tracker only does real work when the title changed.
+    """
+
+    def __init__(self, read_title=read_active_title, min_interval=0.5, max_interval=2.0, backoff=1.5,
+                 clock=SYSTEM_CLOCK):
+        super().__init__(read_title)
+        self.clock = clock
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+
+    def wait(self, timeout):
+        deadline = self.clock.monotonic() + timeout
+        while True:
+            remaining = deadline - self.clock.monotonic()
+            if remaining <= 0:
+                return None
+            self.clock.sleep(min(self.interval, remaining))
+            title = self._read()
+            if title != self.title:
+                self.title = title
+                self.interval = self.min_interval
+                return title
+            self.interval = min(self.interval * self.backoff, self.max_interval)
+
+
+class WinEventWindowSource(WindowSource):
+    """
+    Windows only: SetWinEventHook for foreground switches and window title
+    changes, run on a daemon thread with its own message loop. The hook
+    just marks the title dirty; wait() re-reads it and drops events that
+    didn't change it (apps rename their windows a lot).
+    """
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_SKIPOWNPROCESS = 0x0002
+    OBJID_WINDOW = 0
+
+    def __init__(self, read_title=read_active_title):
+        super().__init__(read_title)
+        self._dirty = False
+        self._changed = threading.Condition()
+        self._started = threading.Event()
+        self._error = None
+        self._thread_id = None
+        threading.Thread(target=self._run, daemon=True).start()
+        self._started.wait()
+        if self._error:
+            raise OSError(self._error)
+
+    def _run(self):
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        kernel32 = ctypes.windll.kernel32
+        WinEventProc = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                          wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+
+        def on_event(hook, event, hwnd, id_object, id_child, thread, ms):
+            if id_object != self.OBJID_WINDOW or hwnd != user32.GetForegroundWindow():
+                return
+            with self._changed:
+                self._dirty = True
+                self._changed.notify_all()
+
+        self._proc = WinEventProc(on_event)  # must outlive the hooks
+        hooks = [user32.SetWinEventHook(event, event, 0, self._proc, 0, 0, self.WINEVENT_SKIPOWNPROCESS)
+                 for event in (self.EVENT_SYSTEM_FOREGROUND, self.EVENT_OBJECT_NAMECHANGE)]
+        if not all(hooks):
+            self._error = "SetWinEventHook failed"
+            self._started.set()
+            return
+        self._thread_id = kernel32.GetCurrentThreadId()
+        self._started.set()
+
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        for hook in hooks:
+            user32.UnhookWinEvent(hook)
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._changed:
+                if not self._changed.wait_for(lambda: self._dirty, deadline - time.monotonic()):
+                    return None
+                self._dirty = False
+            title = self._read()
+            if title != self.title:
+                self.title = title
+                return title
+
+    def close(self):
+        if self._thread_id:
+            import ctypes
+            WM_QUIT = 0x0012
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+
+
+def open_window_source(read_title=read_active_title):
+    """Native change notifications where the platform has them, adaptive polling otherwise"""
+    if sys.platform == "win32":
+        try:
+            return WinEventWindowSource(read_title)
+        except Exception as e:
+            print(f"Error hooking window events, falling back to polling: {e}")
+    return PollingWindowSource(read_title)
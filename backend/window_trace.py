@@ -0,0 +1,191 @@
+"""
+Recorded, replayed and synthetic window sources
+A trace is a JSON-lines file of window changes, {"t": unix time, "title":
+...}, starting with the title at the start of the recording and ending
+with {"t": ..., "title": null} when it stopped.
+
+- RecordingWindowSource: wraps a real source and writes every change it reports
+- ReplayWindowSource:    plays a trace back on a clock (a SimulatedClock
+                         replays it as fast as the tracker can go)
+- synthetic_trace():     a made-up but plausible week of window changes
+
+Record a real session (Ctrl-C to stop) or make a synthetic trace with:
+    python window_trace.py record my_day.jsonl
+    python window_trace.py synth week.jsonl --days 7 --seed 1
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timedelta
+
+from clock import SYSTEM_CLOCK
+from window_source import SourceClosed, open_window_source
+
+
+def read_trace(path):
+    """[(t, title)] from a trace file (the last title is None)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [(event["t"], event["title"]) for event in map(json.loads, f) if event]
+
+
+def write_trace(path, events):
+    with open(path, 'w', encoding='utf-8') as f:
+        for t, title in events:
+            f.write(json.dumps({"t": round(t, 3), "title": title}) + "\n")
+
+
+class RecordingWindowSource:
+    """Passes a source through, appending each change it reports to a trace file"""
+
+    def __init__(self, source, path, clock=SYSTEM_CLOCK):
+        self.source = source
+        self.clock = clock
+        self._file = open(path, 'w', encoding='utf-8')
+        self.title = source.title
+        self._write(self.title)
+
+    @property
+    def reads(self):
+        return self.source.reads
+
+    def _write(self, title):
+        self._file.write(json.dumps({"t": round(self.clock.time(), 3), "title": title}) + "\n")
+        self._file.flush()
+
+    def wait(self, timeout):
+        title = self.source.wait(timeout)
+        if title is not None:
+            self.title = title
+            self._write(title)
+        return title
+
+    def close(self):
+        if not self._file.closed:
+            self._write(None)
+            self._file.close()
+        self.source.close()
+
+
+class ReplayWindowSource:
+    """
+    Reports a trace's window changes on a clock, shifted so the trace starts
+    at the clock's current time. With a SimulatedClock every wait() just
+    moves simulated time forward, so a week replays in seconds.
+    """
+
+    def __init__(self, events, clock=SYSTEM_CLOCK):
+        self.events = events
+        self.clock = clock
+        self.offset = clock.time() - events[0][0]
+        self.title = events[0][1] or "idle"
+        self.reads = 1
+        self._next = 1
+
+    def wait(self, timeout):
+        deadline = self.clock.time() + timeout
+        while True:
+            if self._next >= len(self.events):
+                raise SourceClosed()
+            t, title = self.events[self._next]
+            due = t + self.offset
+            if due > deadline:
+                self.clock.sleep(max(0, deadline - self.clock.time()))
+                return None
+            self.clock.sleep(max(0, due - self.clock.time()))
+            self._next += 1
+            self.reads += 1
+            if title is None:
+                raise SourceClosed()
+            if title != self.title:
+                self.title = title
+                return title
+
+    def close(self):
+        pass
+
+
+# ============= SYNTHETIC TRACES =============
+
+WORK_TITLES = [
+    "main.py - visual studio code", "api_server.py - visual studio code", "untitled - notepad",
+    "quarterly report.docx - word", "project plan - google docs - google chrome",
+    "study notes - google docs - google chrome", "pull request #42 - github - google chrome",
+]
+DISTRACTION_TITLES = [
+    "youtube - google chrome", "reddit: the front page of the internet - google chrome",
+    "netflix - google chrome", "instagram - google chrome", "home / twitter - google chrome",
+    "facebook - google chrome",
+]
+OTHER_TITLES = ["slack | general", "spotify premium", "terminal", "inbox (3) - outlook", "file explorer"]
+
+# (mean seconds in a window, chance of picking this kind next) while working
+WORKDAY_MIX = {"work": (420, 0.6), "distraction": (150, 0.2), "other": (60, 0.2)}
+
+
+def synthetic_trace(days=7, seed=0, start=None):
+    """
+    A plausible stretch of window changes: on weekdays, work from 9 to 17
+    with a lunch break, mostly in work apps with alt-tabs into distractions
+    and chat; an evening of streaming and social media; idle otherwise.
+    Weekends are mostly distractions in the afternoon.
+    """
+    rng = random.Random(seed)
+    start = start or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    titles = {"work": WORK_TITLES, "distraction": DISTRACTION_TITLES, "other": OTHER_TITLES}
+    kinds = list(WORKDAY_MIX)
+    events = [(start.timestamp(), "idle")]
+
+    def session(begin, end, mix):
+        t = begin.timestamp()
+        events.append((t, "idle"))
+        while t < end.timestamp():
+            kind = rng.choices(kinds, [mix[k][1] for k in kinds])[0]
+            # Short alt-tabs happen a lot; occasionally a long stretch
+            dwell = rng.expovariate(1 / mix[kind][0]) + rng.uniform(2, 20)
+            events.append((t, rng.choice(titles[kind])))
+            t += dwell
+        events.append((end.timestamp(), "idle"))
+
+    for day in range(days):
+        midnight = start + timedelta(days=day)
+        if midnight.weekday() < 5:
+            session(midnight + timedelta(hours=9), midnight + timedelta(hours=12, minutes=30), WORKDAY_MIX)
+            session(midnight + timedelta(hours=13, minutes=15), midnight + timedelta(hours=17), WORKDAY_MIX)
+            evening = {"work": (300, 0.1), "distraction": (900, 0.8), "other": (120, 0.1)}
+            session(midnight + timedelta(hours=20), midnight + timedelta(hours=22, minutes=30), evening)
+        else:
+            weekend = {"work": (600, 0.15), "distraction": (1200, 0.7), "other": (300, 0.15)}
+            session(midnight + timedelta(hours=14), midnight + timedelta(hours=18), weekend)
+
+    events.append(((start + timedelta(days=days)).timestamp(), None))
+    return events
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record or generate window traces")
+    sub = parser.add_subparsers(dest="command", required=True)
+    record = sub.add_parser("record", help="record the real active window until Ctrl-C")
+    record.add_argument("path")
+    synth = sub.add_parser("synth", help="write a synthetic trace")
+    synth.add_argument("path")
+    synth.add_argument("--days", type=int, default=7)
+    synth.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "synth":
+        events = synthetic_trace(args.days, args.seed)
+        write_trace(args.path, events)
+        print(f"✓ Wrote {len(events)} window changes over {args.days} days to {args.path}")
+    else:
+        source = RecordingWindowSource(open_window_source(), args.path)
+        print(f"⏺ Recording window changes to {args.path} (Ctrl-C to stop)")
+        try:
+            while True:
+                title = source.wait(60)
+                if title is not None:
+                    print("Current window:", title)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            source.close()
@@ -19,7 +19,8 @@ export interface AppData {
   food_entries: FoodEntry[];
   focus_points: number;
   comfort_vault: ComfortItem[];
-  focus_history: any[];
+  focus_history: PointsEntry[];
+  focus_titles: { id: string; title: string }[];
 }
 
 export interface Task {
@@ -64,12 +65,88 @@ export interface ComfortItem {
   createdAt: string;
 }
 
+export interface PointsEntry {
+  date: string;
+  points: number;
+  source: string;
+  // Focus tracker activity intervals only
+  end?: string;
+  app?: string;
+  category?: string;
+  title_id?: string;
+}
+
+export interface ActivitySummary {
+  date: string;
+  by_app: Record<string, number>;
+  by_category: Record<string, number>;
+}
+
+export interface PointsSummary {
+  focus_points: number;
+  today: number;
+  by_source: Record<string, number>;
+  entries: number;
+}
+
+export interface PointsHistory {
+  bucket: 'hour' | 'day';
+  series: { start: string; points: number }[];
+}
+
+export interface BootstrapResponse {
+  version: number;
+  mode: string;
+  data: Partial<AppData> & { character_state?: string; points_today?: number };
+  counts: Record<string, number>;
+}
+
 export interface StatusResponse {
   character_state: string;
   focus_points: number;
   current_mode: string;
 }
 
+export type Mutation =
+  | { op: 'set'; key: string; value: any }
+  | { op: 'incr'; key: string; by: number }
+  | { op: 'add'; key: string; item: any }
+  | { op: 'update'; key: string; id: string | number; fields: Record<string, any> }
+  | { op: 'remove'; key: string; id: string | number }
+  | { op: 'prune'; key: string; ids: (string | number)[] };
+
+export interface RecordChange {
+  version: number;
+  collection: string;
+  type: 'insert' | 'update' | 'delete';
+  id?: string | number;
+  record?: any;
+  fields?: Record<string, any>;
+}
+
+export type ChangesResponse =
+  | { version: number; reset: false; fields: Record<string, any>; changes: RecordChange[] }
+  | { version: number; reset: true; data: AppData };
+
+export interface BatchOperation {
+  op:
+    | 'set_mode' | 'add_task' | 'toggle_task' | 'delete_task'
+    | 'add_sentiment' | 'add_food' | 'add_comfort' | 'update_points' | 'add_intervals' | 'set_goal';
+  id?: number;
+  body?: Record<string, any>;
+}
+
+export interface BatchResponse {
+  success: boolean;
+  version: number;
+  results: { op: string; status: number; body: any }[];
+}
+
+export type StatusEvent =
+  | { event: 'state'; data: { character_state: string } }
+  | { event: 'points'; data: { focus_points: number; points_today: number } }
+  | { event: 'mode'; data: { current_mode: string } };
+
 // ============= API CLIENT CLASS =============
 
 class ApiClient {
@@ -87,6 +164,23 @@ class ApiClient {
     }
   }
 
+  /**
+   * Subscribe to character state / points / mode changes pushed by the server.
+   * Returns a function that closes the stream.
+   */
+  subscribeStatus(onEvent: (event: StatusEvent) => void, onError?: () => void): () => void {
+    const source = new EventSource(`${API_BASE}/events`);
+    for (const name of ['state', 'points', 'mode'] as const) {
+      source.addEventListener(name, (e) => {
+        onEvent({ event: name, data: JSON.parse((e as MessageEvent).data) } as StatusEvent);
+      });
+    }
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) onError?.();
+    };
+    return () => source.close();
+  }
+
   /**
    * Get all app data
    */
@@ -101,6 +195,54 @@ class ApiClient {
     }
   }
 
+  /**
+   * Get all app data together with its version (for getChanges)
+   */
+  async getDataWithVersion(): Promise<{ data: AppData; version: number }> {
+    try {
+      const response = await fetch(`${API_BASE}/data`);
+      if (!response.ok) throw new Error('Failed to fetch data');
+      const version = Number(response.headers.get('X-Data-Version') ?? 0);
+      return { data: await response.json(), version };
+    } catch (error) {
+      console.error('API Error (getDataWithVersion):', error);
+      throw error;
+    }
+  }
+
+  /**
+   * Get only what changed since a data version. If the server no longer
+   * knows that version the response carries the full data (reset: true).
+   */
+  async getChanges(since: number): Promise<ChangesResponse> {
+    try {
+      const response = await fetch(`${API_BASE}/changes?since=${since}`);
+      if (!response.ok) throw new Error('Failed to fetch changes');
+      return response.json();
+    } catch (error) {
+      console.error('API Error (getChanges):', error);
+      throw error;
+    }
+  }
+
+  /**
+   * Apply a list of mutations instead of re-sending the whole document
+   */
+  async patchData(ops: Mutation[]): Promise<{ version: number }> {
+    try {
+      const response = await fetch(`${API_BASE}/data`, {
+        method: 'PATCH',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ ops }),
+      });
+      if (!response.ok) throw new Error('Failed to patch data');
+      return response.json();
+    } catch (error) {
+      console.error('API Error (patchData):', error);
+      throw error;
+    }
+  }
+
   /**
    * Save all app data
    */
@@ -270,6 +412,87 @@ class ApiClient {
     }
   }
 
+  /**
+   * Get just what one screen needs for first paint, in one request
+   */
+  async getBootstrap(mode?: 'work' | 'chill', fields?: string[], limit?: number): Promise<BootstrapResponse> {
+    try {
+      const params = new URLSearchParams();
+      if (mode) params.set('mode', mode);
+      if (fields) params.set('fields', fields.join(','));
+      if (limit) params.set('limit', String(limit));
+      const response = await fetch(`${API_BASE}/bootstrap?${params}`);
+      if (!response.ok) throw new Error('Failed to fetch bootstrap data');
+      return response.json();
+    } catch (error) {
+      console.error('API Error (getBootstrap):', error);
+      throw error;
+    }
+  }
+
+  /**
+   * Get the points balance, today's points and per-source totals
+   */
+  async getPoints(): Promise<PointsSummary> {
+    try {
+      const response = await fetch(`${API_BASE}/points`);
+      if (!response.ok) throw new Error('Failed to fetch points');
+      return response.json();
+    } catch (error) {
+      console.error('API Error (getPoints):', error);
+      throw error;
+    }
+  }
+
+  /**
+   * Get points per hour or per day for the Focus Tracker chart
+   */
+  async getPointsHistory(bucket: 'hour' | 'day' = 'hour', count?: number): Promise<PointsHistory> {
+    try {
+      const params = new URLSearchParams({ bucket });
+      if (count) params.set('count', String(count));
+      const response = await fetch(`${API_BASE}/points/history?${params}`);
+      if (!response.ok) throw new Error('Failed to fetch points history');
+      return response.json();
+    } catch (error) {
+      console.error('API Error (getPointsHistory):', error);
+      throw error;
+    }
+  }
+
+  /**
+   * Get seconds spent per app and per category on a day (default today)
+   */
+  async getActivity(date?: string): Promise<ActivitySummary> {
+    try {
+      const query = date ? `?date=${encodeURIComponent(date)}` : '';
+      const response = await fetch(`${API_BASE}/focus/activity${query}`);
+      if (!response.ok) throw new Error('Failed to fetch activity');
+      return response.json();
+    } catch (error) {
+      console.error('API Error (getActivity):', error);
+      throw error;
+    }
+  }
+
+  /**
+   * Apply several operations in one request; all of them or none are applied
+   */
+  async batch(operations: BatchOperation[]): Promise<BatchResponse> {
+    try {
+      const response = await fetch(`${API_BASE}/batch`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ operations }),
+      });
+      if (!response.ok) throw new Error('Batch failed');
+      return response.json();
+    } catch (error) {
+      console.error('API Error (batch):', error);
+      throw error;
+    }
+  }
+
   /**
    * Set daily goal
    */
@@ -296,8 +519,9 @@ export const api = new ApiClient();
 import { useState, useEffect } from 'react';
 
 /**
- * Hook to get and auto-refresh status
- * @param intervalMs - Polling interval in milliseconds (default: 2000)
+ * Hook to get live status. Changes are pushed over /api/events; polling is
+ * only used if the event stream is unavailable.
+ * @param intervalMs - Fallback polling interval in milliseconds (default: 2000)
  */
 export function useStatus(intervalMs: number = 2000) {
   const [status, setStatus] = useState<StatusResponse | null>(null);
@@ -305,6 +529,8 @@ export function useStatus(intervalMs: number = 2000) {
   const [error, setError] = useState<Error | null>(null);
 
   useEffect(() => {
+    let interval: ReturnType<typeof setInterval> | null = null;
+
     const fetchStatus = async () => {
       try {
         const data = await api.getStatus();
@@ -317,10 +543,21 @@ export function useStatus(intervalMs: number = 2000) {
       }
     };
 
-    fetchStatus();
-    const interval = setInterval(fetchStatus, intervalMs);
+    const startPolling = () => {
+      if (!interval) interval = setInterval(fetchStatus, intervalMs);
+    };
 
-    return () => clearInterval(interval);
+    fetchStatus();
+    const close = typeof EventSource !== 'undefined'
+      ? api.subscribeStatus(({ data }) => {
+          setStatus((prev) => (prev ? { ...prev, ...data } : prev));
+        }, startPolling)
+      : (startPolling(), () => {});
+
+    return () => {
+      close();
+      if (interval) clearInterval(interval);
+    };
   }, [intervalMs]);
 
   return { status, loading, error };